@@ -0,0 +1,104 @@
+import csv
+import json
+from collections.abc import AsyncIterator
+from typing import Any, NamedTuple
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+
+from app.core.config import get_settings
+
+
+class InvalidRecord(NamedTuple):
+    """Строка массового импорта, которую не удалось разобрать."""
+
+    detail: str
+
+
+def line_too_long(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Record is too long, maximum is {max_size} bytes",
+    )
+
+
+async def iter_lines(request: Request, max_size: int) -> AsyncIterator[bytes]:
+    """
+    Читать тело запроса построчно, вместе с переводом строки, не загружая его
+    целиком. Строка длиннее max_size байт - 413: буфер не растёт без предела.
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            if len(line) >= max_size:
+                raise line_too_long(max_size)
+            yield line + b"\n"
+        if len(buffer) > max_size:
+            raise line_too_long(max_size)
+    if buffer:
+        yield buffer
+
+
+async def iter_csv_rows(lines: AsyncIterator[bytes], max_size: int) -> AsyncIterator[list[str]]:
+    """
+    Записи CSV. Поле в кавычках может содержать перевод строки: физические
+    строки копятся, пока число кавычек нечётное, и разбираются вместе.
+    Запись длиннее max_size байт - 413.
+    """
+    record: list[str] = []
+    size = quotes = 0
+    async for line in lines:
+        if not record and not line.strip():
+            continue
+        size += len(line)
+        if size > max_size:
+            raise line_too_long(max_size)
+        text = line.decode("utf-8")
+        record.append(text)
+        quotes += text.count('"')
+        if quotes % 2 == 0:
+            for values in csv.reader(record):
+                yield values
+            record, size, quotes = [], 0, 0
+    # Незакрытая кавычка: поле продолжается до конца тела
+    for values in csv.reader(record):
+        yield values
+
+
+async def iter_bulk_records(request: Request) -> AsyncIterator[tuple[int, Any]]:
+    """
+    Разобрать тело запроса в формате NDJSON или CSV (с заголовком).
+    Возвращает пары (номер записи, запись) или (номер записи, InvalidRecord);
+    запись NDJSON может оказаться не объектом, её отклонит валидация.
+    """
+    max_size = get_settings().BULK_MAX_RECORD_SIZE
+    lines = iter_lines(request, max_size)
+    row = 0
+    if not request.headers.get("content-type", "").startswith("text/csv"):
+        async for line in lines:
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                yield row, json.loads(line)
+            except ValueError:
+                yield row, InvalidRecord("Invalid JSON")
+        return
+
+    header: list[str] | None = None
+    async for values in iter_csv_rows(lines, max_size):
+        if header is None:
+            header = values
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, InvalidRecord("Wrong number of columns")
+            continue
+        yield row, {key: value or None for key, value in zip(header, values)}
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
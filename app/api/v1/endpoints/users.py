@@ -1,169 +1,964 @@
-from uuid import UUID
-
-import bcrypt
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import and_, select
+import asyncio
+import base64
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from contextlib import asynccontextmanager
+from typing import Any, Literal
+from uuid import UUID, uuid4
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.base import get_db
-from app.db.models import User
-from app.schemas.user import UserCreate, UserFilter, UserResponse, UserUpdate
+from app.api.v1.bulk import InvalidRecord, format_validation_error, iter_bulk_records
+from app.core.admission import AdmissionRejected, get_admission_limiter
+from app.core.cache import get_user_cache
+from app.core.coalesce import get_single_flight
+from app.core.config import get_settings
+from app.core.security import HashingQueueFull, get_password_hasher
+from app.db.base import get_db, get_read_db
+from app.db.changes import change_notifier
+from app.db.deadline import DeadlineExceeded, get_deadline, request_deadline
+from app.db.repository import (
+    USER_RESPONSE_FIELDS,
+    ChangePosition,
+    Cursor,
+    LoginAlreadyExists,
+    RepositoryError,
+    UserRepository,
+    get_read_user_repository,
+    get_user_repository,
+)
+from app.schemas.user import (
+    BulkImportReport,
+    BulkImportRow,
+    PasswordVerify,
+    PasswordVerifyResponse,
+    UserBatchGet,
+    UserBatchResponse,
+    UserCreate,
+    UserFilter,
+    UserFilterUpdate,
+    UserFilterWriteResponse,
+    UserResponse,
+    UserStatsRequest,
+    UserStatsResponse,
+    UserUpdate,
+)
+
+settings = get_settings()
 
 router = APIRouter()
 
 
-async def get_user_by_login(db: AsyncSession, login: str) -> User | None:
-    """Получить пользователя по login."""
-    result = await db.execute(select(User).where(User.login == login))
-    return result.scalar_one_or_none()
+def write_error(error: RepositoryError, action: str) -> HTTPException:
+    """Ошибка API для ошибки хранилища при изменении пользователя."""
+    if isinstance(error, LoginAlreadyExists):
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this login already exists",
+        )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Error {action} user: {str(error)}",
+    )
+
+
+def user_to_dict(user: Row, fields: tuple[str, ...] = USER_RESPONSE_FIELDS) -> dict[str, Any]:
+    """Поля UserResponse (или только fields) из строки пользователя."""
+    return {field: getattr(user, field) for field in fields}
+
+
+def serialize_user(user: Row, fields: tuple[str, ...] = USER_RESPONSE_FIELDS) -> bytes:
+    """Сериализовать пользователя в JSON UserResponse."""
+    return orjson.dumps(user_to_dict(user, fields))
 
 
-async def get_user_by_id(db: AsyncSession, user_id: UUID) -> User | None:
-    """Получить пользователя по user_id."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    return result.scalar_one_or_none()
+def serialize_users(users: list[Row], fields: tuple[str, ...] = USER_RESPONSE_FIELDS) -> bytes:
+    """Сериализовать список пользователей в JSON-массив UserResponse."""
+    return orjson.dumps([user_to_dict(user, fields) for user in users])
 
 
-async def check_login_availability(db: AsyncSession, login: str) -> None:
-    """Проверить доступность login."""
-    if await get_user_by_login(db, login):
+def parse_fields(
+    fields: str | None = Query(
+        None, max_length=256, description="Поля ответа через запятую, например id,name,surname"
+    ),
+) -> tuple[str, ...]:
+    """
+    Поля ответа из параметра fields в порядке полей UserResponse.
+    Без параметра - все поля; из БД читаются только выбранные колонки.
+    """
+    if fields is None:
+        return USER_RESPONSE_FIELDS
+    requested = {field.strip() for field in fields.split(",")} - {""}
+    unknown = requested.difference(USER_RESPONSE_FIELDS)
+    if unknown or not requested:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this login already exists",
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}" if unknown else "No fields requested",
         )
+    return tuple(field for field in USER_RESPONSE_FIELDS if field in requested)
+
 
+def json_response(payload: bytes, status_code: int = status.HTTP_200_OK, **kwargs) -> Response:
+    """Ответ с уже сериализованным JSON."""
+    return Response(content=payload, status_code=status_code, media_type="application/json", **kwargs)
 
-def hash_password(password: str) -> str:
-    """Хешировать пароль."""
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
+def make_etag(version: int) -> str:
+    """ETag для версии строки пользователя."""
+    return f'"{version}"'
 
-@router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+
+def parse_etags(header: str) -> list[int]:
+    """Версии из заголовка If-Match / If-None-Match; нераспознанные теги пропускаются."""
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag.isdigit():
+            versions.append(int(tag))
+    return versions
+
+
+def etag_matches(header: str | None, version: int) -> bool:
+    """Совпадает ли версия с одним из тегов заголовка."""
+    if header is None:
+        return False
+    return header.strip() == "*" or version in parse_etags(header)
+
+
+def if_match_versions(if_match: str | None) -> list[int] | None:
+    """Допустимые версии для изменения по заголовку If-Match; None - любая."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    return parse_etags(if_match)
+
+
+async def raise_write_failed(repository: UserRepository, user_id: UUID, if_match: str | None) -> None:
+    """
+    Изменение не затронуло пользователя: его нет (404)
+    или версия не совпала с If-Match (412).
+    """
+    if if_match is not None and await repository.get(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User was modified"
+        )
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+
+def user_response(user: Row, status_code: int = status.HTTP_200_OK) -> Response:
+    """Ответ с пользователем и ETag его версии."""
+    return json_response(
+        serialize_user(user), status_code, headers={"ETag": make_etag(user.version)}
+    )
+
+
+def refresh_cached_user(user: Row) -> None:
+    """Обновить запись кеша после изменения; запись более новой версии не заменяется."""
+    cache = get_user_cache()
+    cached = cache.peek(user.id) if cache is not None else None
+    if cache is not None and (cached is None or cached[0] < user.version):
+        cache.invalidate(user.id)
+        cache.set(user.id, (user.version, serialize_user(user)))
+
+
+def invalidate_cached_user(user_id: UUID) -> None:
+    """Удалить пользователя из кеша."""
+    cache = get_user_cache()
+    if cache is not None:
+        cache.invalidate(user_id)
+
+
+async def coalesced(group: str, key: Hashable, read: Callable[[], Awaitable[Any]]) -> Any:
+    """Выполнить чтение, объединив его с таким же одновременным чтением."""
+    flight = get_single_flight(group)
+    if flight is None:
+        return await read()
+    return await flight.run(key, read)
+
+
+def users_changed(user_id: UUID | None = None) -> None:
+    """
+    После изменения данных отцепить идущие объединённые чтения пользователя
+    user_id (без него - всех пользователей) и все выборки по фильтру
+    и разбудить подписчиков /users/changes этого процесса.
+    """
+    change_notifier.notify()
+    flight = get_single_flight("user")
+    if flight is not None:
+        if user_id is None:
+            flight.clear()
+        else:
+            flight.forget(lambda key: key[0] == user_id)
+    flight = get_single_flight("user_filter")
+    if flight is not None:
+        flight.clear()
+
+
+def hashing_busy() -> HTTPException:
+    """Ошибка при переполненной очереди хеширования."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many password hashing requests",
+        headers={"Retry-After": "1"},
+    )
+
+
+def admission(group: str) -> Callable[[], AsyncIterator[None]]:
+    """
+    Зависимость: выполнять запрос в слоте своего класса эндпоинтов.
+    При заполненной очереди класса - сразу 503 с Retry-After.
+    """
+    async def admit() -> AsyncIterator[None]:
+        limiter = get_admission_limiter(group)
+        if limiter is None:
+            yield
+            return
+        try:
+            async with limiter.slot():
+                yield
+        except AdmissionRejected as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Too many {e.group} requests",
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+            ) from e
+
+    return admit
+
+
+ADMIT_HASHING = [Depends(admission("hashing"))]
+ADMIT_WRITE = [Depends(admission("write"))]
+ADMIT_READ = [Depends(admission("read"))]
+
+
+def deadline(route: str) -> Callable[..., AsyncIterator[None]]:
+    """
+    Зависимость: ограничить запросы к БД бюджетом времени маршрута.
+    По истечении бюджета - 504, без свободного соединения в пуле - 503 с
+    Retry-After; отключение клиента прерывает запрос к БД.
+    Стоит после admission: ожидание слота в бюджет не входит.
+    """
+    async def limit(
+        request: Request,
+        db: AsyncSession = Depends(get_db),
+        read_db: AsyncSession = Depends(get_read_db),
+    ) -> AsyncIterator[None]:
+        budget = get_deadline(route)
+        if budget is None:
+            yield
+            return
+        try:
+            async with request_deadline(route, budget, (db, read_db), request.receive):
+                yield
+        except DeadlineExceeded as e:
+            if e.reason == "disconnect":
+                # Ответ клиент уже не получит, статус - для логов и метрик
+                raise HTTPException(status_code=499, detail="Client closed request") from e
+            if e.reason == "pool_timeout":
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="No database connection available",
+                    headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+                ) from e
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Request deadline exceeded"
+            ) from e
+
+    return limit
+
+
+DEADLINE_LOOKUP = Depends(deadline("lookup"))
+DEADLINE_SEARCH = Depends(deadline("search"))
+DEADLINE_FILTER = Depends(deadline("filter"))
+DEADLINE_WRITE = Depends(deadline("write"))
+DEADLINE_HASHING = Depends(deadline("hashing"))
+
+
+async def admit_update(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+) -> AsyncIterator[None]:
+    """
+    Зависимость PATCH /users/{user_id}: изменение с password хеширует пароль и
+    выполняется в классе hashing с его бюджетом, остальные - в классе write.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None  # Ошибку тела вернёт валидация
+    group = "hashing" if isinstance(body, dict) and "password" in body else "write"
+    async with asynccontextmanager(admission(group))():
+        async with asynccontextmanager(deadline(group))(request, db, read_db):
+            yield
+
+
+async def hash_password(password: str) -> str:
+    """Хешировать пароль в пуле, не блокируя цикл событий."""
+    try:
+        return await get_password_hasher().hash(password)
+    except HashingQueueFull:
+        raise hashing_busy()
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """Хешировать пачку паролей параллельно в пуле."""
+    try:
+        return await get_password_hasher().hash_many(passwords)
+    except HashingQueueFull:
+        raise hashing_busy()
+
+
+async def rehash_password(repository: UserRepository, user: Row, password: str) -> None:
+    """
+    Пересчитать хеш с текущей стоимостью после успешной проверки пароля.
+    Выполняется по возможности: при занятом пуле или ошибке БД хеш остаётся прежним.
+    Хеш заменяется, только если пароль не успели сменить параллельно.
+    """
+    try:
+        new_hash = await get_password_hasher().hash(password)
+        await repository.replace_password_hash(user.id, user.password_hash, new_hash)
+    except (HashingQueueFull, RepositoryError):
+        return
+
+
+def login_conflict(row: int, login: str) -> BulkImportRow:
+    return BulkImportRow(row=row, status="conflict", login=login, detail="User with this login already exists")
+
+
+async def import_chunk(
+    repository: UserRepository, chunk: list[tuple[int, Any]], seen_logins: set[str]
+) -> list[BulkImportRow]:
+    """
+    Проверить, захешировать и вставить пачку пользователей одним запросом.
+    Логин, занятый параллельно после проверки, - конфликт только своей строки.
+    """
+    rows: list[BulkImportRow] = []
+    valid: list[tuple[int, UserCreate]] = []
+    for row, record in chunk:
+        if isinstance(record, InvalidRecord):
+            rows.append(BulkImportRow(row=row, status="invalid", detail=record.detail))
+            continue
+        try:
+            valid.append((row, UserCreate.model_validate(record)))
+        except ValidationError as e:
+            rows.append(
+                BulkImportRow(row=row, status="invalid", detail=format_validation_error(e))
+            )
+
+    logins = {user.login for _, user in valid}
+    taken = await repository.existing_logins(logins) | seen_logins
+
+    new_users: list[tuple[int, UserCreate]] = []
+    for row, user in valid:
+        if user.login in taken:
+            rows.append(login_conflict(row, user.login))
+            continue
+        taken.add(user.login)
+        new_users.append((row, user))
+
+    password_hashes = await hash_passwords([user.password for _, user in new_users])
+    values = [
+        {**user.model_dump(exclude={"password"}), "id": uuid4(), "password_hash": password_hash}
+        for (_, user), password_hash in zip(new_users, password_hashes)
+    ]
+
+    try:
+        created = await repository.create_many(values) if values else set()
+    except RepositoryError as e:
+        raise write_error(e, "importing")
+
+    seen_logins.update(created)
+    rows.extend(
+        BulkImportRow(row=row, status="created", id=value["id"], login=value["login"])
+        if value["login"] in created else login_conflict(row, value["login"])
+        for (row, _), value in zip(new_users, values)
+    )
+    rows.sort(key=lambda item: item.row)
+    return rows
+
+
+@router.post(
+    "",
+    response_model=UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[*ADMIT_HASHING, DEADLINE_HASHING],
+)
+async def create_user(
+    user: UserCreate,
+    repository: UserRepository = Depends(get_user_repository)
+):
     """Создать нового пользователя."""
-    await check_login_availability(db, user.login)
+    user_data = user.model_dump(exclude={"password"})
+    user_data["password_hash"] = await hash_password(user.password)
 
-    user_data = user.dict(exclude={"password"})
-    user_data["password_hash"] = hash_password(user.password)
+    try:
+        new_user = await repository.create(user_data)
+    except RepositoryError as e:
+        raise write_error(e, "creating")
+    users_changed(new_user.id)
+    return user_response(new_user, status.HTTP_201_CREATED)
 
-    new_user = User(**user_data)
-    db.add(new_user)
 
+@router.post("/bulk", response_model=BulkImportReport, dependencies=ADMIT_HASHING)
+async def create_users_bulk(
+    request: Request,
+    repository: UserRepository = Depends(get_user_repository)
+):
+    """
+    Массово создать пользователей из потока NDJSON или CSV.
+    Записи обрабатываются пачками по BULK_CHUNK_SIZE, каждая пачка
+    вставляется одним запросом.
+    """
+    chunk_size = settings.BULK_CHUNK_SIZE
+    report = BulkImportReport()
+    seen_logins: set[str] = set()
+    chunk: list[tuple[int, Any]] = []
+
+    async def flush() -> None:
+        items = await import_chunk(repository, chunk, seen_logins)
+        users_changed()
+        for item in items:
+            report.rows.append(item)
+            if item.status == "created":
+                report.created += 1
+            elif item.status == "conflict":
+                report.conflicts += 1
+            else:
+                report.invalid += 1
+        chunk.clear()
+
+    async for record in iter_bulk_records(request):
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            await flush()
+    if chunk:
+        await flush()
+    return report
+
+
+@router.post("/verify_password", response_model=PasswordVerifyResponse, dependencies=[*ADMIT_HASHING, DEADLINE_HASHING])
+async def verify_user_password(
+    credentials: PasswordVerify,
+    repository: UserRepository = Depends(get_user_repository)
+):
+    """
+    Проверить login и пароль. Проверка выполняется в пуле хеширования;
+    хеш с устаревшей стоимостью пересчитывается после успешной проверки.
+    """
+    user = await repository.get_credentials(credentials.login)
+
+    hasher = get_password_hasher()
     try:
-        await db.commit()
-        await db.refresh(new_user)
-        return new_user
-    except Exception as e:
-        await db.rollback()
+        valid = await hasher.verify(credentials.password, user.password_hash if user else None)
+    except HashingQueueFull:
+        raise hashing_busy()
+    if not valid:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error creating user: {str(e)}",
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid login or password"
         )
 
+    if hasher.needs_rehash(user.password_hash):
+        await rehash_password(repository, user, credentials.password)
+    return {"id": user.id, "valid": True}
+
 
-@router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
-    """Получить пользователя по id."""
-    user = await get_user_by_id(db, user_id)
-    if not user:
+@router.post("/batch_get", response_model=UserBatchResponse, dependencies=[*ADMIT_READ, DEADLINE_LOOKUP])
+async def get_users_batch(
+    batch: UserBatchGet,
+    repository: UserRepository = Depends(get_read_user_repository)
+):
+    """
+    Получить пользователей по списку id.
+    Повторяющиеся id отбрасываются, ненайденные возвращаются в missing.
+    С keep_order=true пользователи идут в порядке запроса.
+    """
+    user_ids = list(dict.fromkeys(batch.ids))
+    if len(user_ids) > settings.BATCH_GET_MAX_IDS:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Too many ids, maximum is {settings.BATCH_GET_MAX_IDS}",
+        )
+
+    users = await repository.get_many(user_ids) if user_ids else []
+    found = {user.id: user for user in users}
+    if batch.keep_order:
+        users = [found[user_id] for user_id in user_ids if user_id in found]
+    return json_response(
+        orjson.dumps(
+            {
+                "users": [user_to_dict(user) for user in users],
+                "missing": [user_id for user_id in user_ids if user_id not in found],
+            }
         )
-    return user
+    )
 
 
-@router.put("/{user_id}", response_model=UserResponse)
-async def update_user(
-    user_id: UUID, user: UserCreate, db: AsyncSession = Depends(get_db)
+@router.get("/search", response_model=list[UserResponse], dependencies=[*ADMIT_READ, DEADLINE_SEARCH])
+async def search_users(
+    q: str = Query(..., min_length=2, max_length=64),
+    limit: int = Query(20, ge=1, le=settings.SEARCH_MAX_LIMIT),
+    repository: UserRepository = Depends(get_read_user_repository)
+):
+    """
+    Найти пользователей по началу или похожему написанию фамилии,
+    имени, отчества или login. Результаты отсортированы по релевантности.
+    """
+    return json_response(serialize_users(await repository.search(q.strip(), limit)))
+
+
+def export_filter(  # pylint: disable=too-many-arguments
+    name: str | None = Query(None, max_length=64),
+    surname: str | None = Query(None, max_length=64),
+    patronymic: str | None = Query(None, max_length=64),
+    type: str | None = Query(None, pattern="^(teacher|student|headteacher)$"),  # pylint: disable=redefined-builtin
+    class_name: str | None = Query(None, max_length=8),
+    login: str | None = Query(None, max_length=64),
+    subject: str | None = Query(None, max_length=64),
+) -> UserFilter:
+    """Поля UserFilter из параметров запроса; не переданные поля не фильтруют."""
+    values = {
+        "name": name, "surname": surname, "patronymic": patronymic, "type": type,
+        "class_name": class_name, "login": login, "subject": subject,
+    }
+    return UserFilter(**{field: value for field, value in values.items() if value is not None})
+
+
+def format_csv(users: list[Row]) -> bytes:
+    """Строки пользователей в CSV."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [getattr(user, field) for field in USER_RESPONSE_FIELDS] for user in users
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+def format_ndjson(users: list[Row]) -> bytes:
+    """Строки пользователей в NDJSON: по объекту UserResponse на строку."""
+    return b"".join(orjson.dumps(user_to_dict(user)) + b"\n" for user in users)
+
+
+# Формат: функция сериализации порции, тип содержимого, заголовок файла
+EXPORT_FORMATS = {
+    "csv": (format_csv, "text/csv; charset=utf-8", ",".join(USER_RESPONSE_FIELDS).encode() + b"\r\n"),
+    "ndjson": (format_ndjson, "application/x-ndjson", b""),
+}
+
+
+async def export_users(
+    batches: AsyncIterator[list[Row]], export_format: str, compress: bool
+) -> AsyncIterator[bytes]:
+    """
+    Выгружать пользователей порциями по мере чтения из хранилища.
+    В памяти одновременно не больше одной порции строк.
+    """
+    formatter, _, header = EXPORT_FORMATS[export_format]
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def encode(chunk: bytes) -> bytes:
+        return compressor.compress(chunk) if compressor is not None else chunk
+
+    pending = header
+    async for users in batches:
+        yield encode(pending + formatter(users))
+        pending = b""
+    tail = encode(pending) + (compressor.flush() if compressor is not None else b"")
+    if tail:
+        yield tail
+
+
+@router.get("/export", response_model=None, dependencies=ADMIT_READ)
+async def export(
+    export_format: Literal["csv", "ndjson"] = Query("ndjson", alias="format"),
+    gzip: bool = Query(False, description="Сжать ответ (Content-Encoding: gzip)"),
+    user_filter: UserFilter = Depends(export_filter),
+    repository: UserRepository = Depends(get_read_user_repository)
 ):
-    """Полностью обновить данные пользователя."""
-    existing_user = await get_user_by_id(db, user_id)
-    if not existing_user:
+    """
+    Выгрузить пользователей по фильтру в CSV или NDJSON.
+    Строки читаются из серверного курсора и отдаются порциями по мере
+    чтения, поэтому память не растёт с размером таблицы.
+    """
+    batches = repository.iter_batches(
+        user_filter, None, None, settings.EXPORT_BATCH_SIZE, ordered=False
+    )
+    headers = {"Content-Disposition": f'attachment; filename="users.{export_format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export_users(batches, export_format, gzip),
+        media_type=EXPORT_FORMATS[export_format][1],
+        headers=headers,
+    )
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Счётчики кеша GET /users/{user_id}."""
+    cache = get_user_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+def require_filter(user_filter: UserFilter) -> None:
+    """Изменение по множеству с пустым фильтром запрещено."""
+    if not user_filter.model_fields_set:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Filter must not be empty"
         )
 
-    if user.login != existing_user.login:
-        await check_login_availability(db, user.login)
 
-    for field, value in user.dict(exclude={"password"}).items():
-        setattr(existing_user, field, value)
+def clear_user_cache() -> None:
+    """Очистить кеш: изменение по фильтру не знает id затронутых строк."""
+    cache = get_user_cache()
+    if cache is not None:
+        cache.clear()
 
-    existing_user.password_hash = hash_password(user.password)
 
-    try:
-        await db.commit()
-        await db.refresh(existing_user)
-        return existing_user
-    except Exception as e:
-        await db.rollback()
+# Маршруты /user_filter для PATCH и DELETE объявлены до /{user_id},
+# иначе "user_filter" попадёт в параметр user_id
+@router.patch("/user_filter", response_model=UserFilterWriteResponse, dependencies=[*ADMIT_WRITE, DEADLINE_FILTER])
+async def update_users(
+    update_request: UserFilterUpdate,
+    dry_run: bool = Query(False, description="Только посчитать подходящих пользователей"),
+    repository: UserRepository = Depends(get_user_repository)
+):
+    """
+    Изменить всех пользователей, подходящих под фильтр, одним UPDATE.
+    Версия каждой строки увеличивается. С dry_run=true изменения не
+    выполняются, возвращается количество подходящих пользователей.
+    """
+    require_filter(update_request.filter)
+    values = update_request.values.model_dump(exclude_unset=True)
+    if not values:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error updating user: {str(e)}",
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Nothing to update"
         )
+    if dry_run:
+        return {"count": await repository.count(update_request.filter), "dry_run": True}
 
+    try:
+        count = await repository.update_where(update_request.filter, values)
+    except RepositoryError as e:
+        raise write_error(e, "updating")
+    if count:
+        clear_user_cache()
+        users_changed()
+    return {"count": count, "dry_run": False}
 
-@router.patch("/{user_id}", response_model=UserResponse)
-async def update_user_partial(
-    user_id: UUID, user: UserUpdate, db: AsyncSession = Depends(get_db)
+
+@router.delete("/user_filter", response_model=UserFilterWriteResponse, dependencies=[*ADMIT_WRITE, DEADLINE_FILTER])
+async def delete_users(
+    user_filter: UserFilter,
+    dry_run: bool = Query(False, description="Только посчитать подходящих пользователей"),
+    repository: UserRepository = Depends(get_user_repository)
 ):
-    """Частично обновить данные пользователя."""
-    existing_user = await get_user_by_id(db, user_id)
-    if not existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
+    """
+    Удалить всех пользователей, подходящих под фильтр, одним DELETE.
+    С dry_run=true удаление не выполняется, возвращается количество
+    подходящих пользователей.
+    """
+    require_filter(user_filter)
+    if dry_run:
+        return {"count": await repository.count(user_filter), "dry_run": True}
 
-    update_data = user.dict(exclude_unset=True)
+    try:
+        count = await repository.delete_where(user_filter)
+    except RepositoryError as e:
+        raise write_error(e, "deleting")
+    if count:
+        clear_user_cache()
+        users_changed()
+    return {"count": count, "dry_run": False}
 
-    if "login" in update_data and update_data["login"] != user.login:
-        await check_login_availability(db, update_data["login"])
 
-    if "password" in update_data:
-        update_data["password_hash"] = hash_password(update_data.pop("password"))
+def encode_change_id(change: Row) -> str:
+    """id события SSE: позиция изменения в журнале."""
+    return f"{change.txid}-{change.id}"
 
-    for field, value in update_data.items():
-        setattr(existing_user, field, value)
 
+def decode_change_id(event_id: str) -> ChangePosition:
+    """Раскодировать id события, полученный из encode_change_id."""
     try:
-        await db.commit()
-        await db.refresh(existing_user)
-        return existing_user
-    except Exception as e:
-        await db.rollback()
+        txid, change_id = event_id.split("-")
+        return int(txid), int(change_id)
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error updating user: {str(e)}",
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid event id"
         )
 
 
-@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
-    """Удалить пользователя."""
-    user = await get_user_by_id(db, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+def format_change(change: Row) -> bytes:
+    """Изменение в формате Server-Sent Events."""
+    data = orjson.dumps({"user_id": change.user_id, "op": change.op, "changed_at": change.changed_at})
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+        encode_change_id(change).encode("ascii"), change.op.encode("ascii"), data
+    )
+
+
+async def stream_changes(repository: UserRepository, position: ChangePosition) -> AsyncIterator[bytes]:
+    """
+    Отдавать изменения из журнала после position: сначала накопленные, затем
+    новые по мере уведомлений. Без уведомлений журнал перечитывается раз в
+    CHANGES_HEARTBEAT секунд, и клиенту уходит комментарий-пинг.
+    """
+    batch_size = settings.CHANGES_BATCH_SIZE
+    yield b"retry: 3000\n\n"
+    while True:
+        wake = change_notifier.event()
+        # Подписчики на одной позиции читают журнал одним запросом
+        changes = await coalesced(
+            "changes",
+            (position, repository.source),
+            lambda: repository.changes_after(position, batch_size),
+        )
+        if changes:
+            position = (changes[-1].txid, changes[-1].id)
+            yield b"".join(format_change(change) for change in changes)
+        if len(changes) < batch_size:
+            try:
+                await asyncio.wait_for(wake.wait(), settings.CHANGES_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+
+
+@router.get("/changes", response_model=None, dependencies=ADMIT_READ)
+async def get_changes(
+    last_event_id: str | None = Header(None),
+    after: str | None = Query(None, description="id события, после которого продолжить"),
+    repository: UserRepository = Depends(get_user_repository)
+):
+    """
+    Поток изменений пользователей (Server-Sent Events): события created,
+    updated и deleted с id пользователя. Продолжение после события - по
+    заголовку Last-Event-ID (его шлёт EventSource при переподключении) или
+    параметру after; без них поток начинается с текущего момента.
+    """
+    resume_from = last_event_id or after
+    if resume_from is not None:
+        position = decode_change_id(resume_from)
+    else:
+        position = await repository.last_change_position()
+    return StreamingResponse(
+        stream_changes(repository, position),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{user_id}", response_model=UserResponse, dependencies=[*ADMIT_READ, DEADLINE_LOOKUP])
+async def get_user(
+    user_id: UUID,
+    if_none_match: str | None = Header(None),
+    fields: tuple[str, ...] = Depends(parse_fields),
+    repository: UserRepository = Depends(get_read_user_repository)
+):
+    """
+    Получить пользователя по id.
+    Ответ содержит ETag; при совпадении с If-None-Match - 304 без тела.
+    С fields ответ содержит только перечисленные поля.
+    """
+    # В кеше - только полные ответы
+    cache = get_user_cache() if fields == USER_RESPONSE_FIELDS else None
+    cached = cache.get(user_id) if cache is not None else None
+    if cached is not None:
+        version, payload = cached
+    else:
+        # Поколение до чтения: изменённый или удалённый во время чтения пользователь не попадёт в кеш
+        generation = cache.generation(user_id) if cache is not None else None
+        # Ключ включает источник: чтения с реплики и с основной БД не объединяются
+        user = await coalesced(
+            "user", (user_id, repository.source, fields), lambda: repository.get(user_id, fields)
         )
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        version, payload = user.version, None
+
+    headers = {"ETag": make_etag(version)}
+    if etag_matches(if_none_match, version):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if payload is None:
+        payload = serialize_user(user, fields)
+        if cache is not None:
+            cache.set(user_id, (version, payload), generation)
+    return json_response(payload, headers=headers)
+
 
+@router.put("/{user_id}", response_model=UserResponse, dependencies=[*ADMIT_HASHING, DEADLINE_HASHING])
+async def update_user(
+    user_id: UUID,
+    user: UserCreate,
+    if_match: str | None = Header(None),
+    repository: UserRepository = Depends(get_user_repository)
+):
+    """
+    Полностью обновить данные пользователя.
+    С If-Match обновление выполняется, только если версия не изменилась.
+    """
+    update_data = user.model_dump(exclude={"password"})
+    update_data["password_hash"] = await hash_password(user.password)
+
+    try:
+        updated_user = await repository.update(user_id, update_data, if_match_versions(if_match))
+    except RepositoryError as e:
+        raise write_error(e, "updating")
+    if not updated_user:
+        await raise_write_failed(repository, user_id, if_match)
+    refresh_cached_user(updated_user)
+    users_changed(user_id)
+    return user_response(updated_user)
+
+
+@router.patch("/{user_id}", response_model=UserResponse, dependencies=[Depends(admit_update)])
+async def update_user_partial(
+    user_id: UUID,
+    user: UserUpdate,
+    if_match: str | None = Header(None),
+    repository: UserRepository = Depends(get_user_repository)
+):
+    """
+    Частично обновить данные пользователя.
+    С If-Match обновление выполняется, только если версия не изменилась.
+    """
+    update_data = user.model_dump(exclude_unset=True)
+    if "password" in update_data:
+        update_data["password_hash"] = await hash_password(update_data.pop("password"))
+
+    if update_data:
+        try:
+            updated_user = await repository.update(user_id, update_data, if_match_versions(if_match))
+        except RepositoryError as e:
+            raise write_error(e, "updating")
+    else:
+        updated_user = await repository.get(user_id)
+        if updated_user and if_match is not None and not etag_matches(if_match, updated_user.version):
+            updated_user = None
+
+    if not updated_user:
+        await raise_write_failed(repository, user_id, if_match)
+    refresh_cached_user(updated_user)
+    users_changed(user_id)
+    return user_response(updated_user)
+
+
+@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[*ADMIT_WRITE, DEADLINE_WRITE])
+async def delete_user(
+    user_id: UUID,
+    if_match: str | None = Header(None),
+    repository: UserRepository = Depends(get_user_repository)
+):
+    """
+    Удалить пользователя.
+    С If-Match удаление выполняется, только если версия не изменилась.
+    """
     try:
-        await db.delete(user)
-        await db.commit()
-    except Exception as e:
-        await db.rollback()
+        deleted = await repository.delete(user_id, if_match_versions(if_match))
+    except RepositoryError as e:
+        raise write_error(e, "deleting")
+    invalidate_cached_user(user_id)
+    users_changed(user_id)
+    if not deleted:
+        await raise_write_failed(repository, user_id, if_match)
+
+
+def encode_cursor(user: Row) -> str:
+    """Закодировать позицию (surname, id) в непрозрачный курсор."""
+    raw = json.dumps([user.surname, str(user.id)], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Раскодировать курсор, полученный из encode_cursor."""
+    try:
+        surname, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(surname), UUID(user_id)
+    except (ValueError, TypeError):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error deleting user: {str(e)}",
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
         )
 
 
-@router.post("/user_filter", response_model=list[UserResponse])
-async def get_users(
+async def stream_users(
+    batches: AsyncIterator[list[Row]], fields: tuple[str, ...] = USER_RESPONSE_FIELDS
+) -> AsyncIterator[bytes]:
+    """Отдавать JSON-массив пользователей порциями по мере чтения из хранилища."""
+    yield b"["
+    first = True
+    async for users in batches:
+        payload = serialize_users(users, fields)[1:-1]
+        if not payload:
+            continue
+        if not first:
+            yield b","
+        first = False
+        yield payload
+    yield b"]"
+
+
+@router.post("/user_filter", response_model=list[UserResponse], dependencies=[*ADMIT_READ, DEADLINE_FILTER])
+async def get_users(  # pylint: disable=too-many-arguments
     user_filter: UserFilter,
-    db: AsyncSession = Depends(get_db)
+    limit: int | None = Query(None, ge=1, le=settings.FILTER_MAX_LIMIT),
+    after: str | None = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+    stream: bool = Query(False, description="Отдавать строки по мере чтения из БД"),
+    fields: tuple[str, ...] = Depends(parse_fields),
+    repository: UserRepository = Depends(get_read_user_repository)
+):
+    """
+    Получить пользователей по фильтру в порядке (surname, id).
+    С limit ответ содержит одну страницу, курсор следующей страницы
+    передаётся в заголовке X-Next-Cursor. С stream=true строки отдаются
+    потоком из серверного курсора. С fields ответ содержит только
+    перечисленные поля.
+    """
+    position = decode_cursor(after) if after is not None else None
+    if stream:
+        batches = repository.iter_batches(
+            user_filter, position, limit, settings.FILTER_STREAM_BATCH_SIZE, fields=fields
+        )
+        return StreamingResponse(stream_users(batches, fields), media_type="application/json")
+
+    async def read_page() -> tuple[bytes, dict[str, str]]:
+        users = await repository.find(
+            user_filter, position, None if limit is None else limit + 1, fields
+        )
+        headers = {}
+        if limit is not None and len(users) > limit:
+            users = users[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(users[-1])
+        return serialize_users(users, fields), headers
+
+    filter_key = tuple(sorted(user_filter.model_dump(exclude_unset=True).items()))
+    payload, headers = await coalesced(
+        "user_filter", (filter_key, after, limit, fields, repository.source), read_page
+    )
+    return json_response(payload, headers=headers)
+
+
+@router.post(
+    "/stats",
+    response_model=UserStatsResponse,
+    response_model_exclude_unset=True,
+    dependencies=[*ADMIT_READ, DEADLINE_FILTER],
+)
+async def get_users_stats(
+    stats: UserStatsRequest,
+    repository: UserRepository = Depends(get_read_user_repository)
 ):
-    filter_data = user_filter.dict(exclude_unset=True)
-    filters = [getattr(User, field) == value for field, value in filter_data.items()]
-    result = await db.execute(select(User).filter(and_(*filters)))
-    users = result.scalars().all()
-    return users
+    """
+    Количество пользователей по фильтру с группировкой по полям group_by.
+    Считается одним запросом GROUP BY, строки пользователей не читаются.
+    """
+    groups = await repository.count_groups(stats.filter, list(dict.fromkeys(stats.group_by)))
+    return {"total": sum(group["count"] for group in groups), "groups": groups}
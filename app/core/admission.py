@@ -0,0 +1,104 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from app.core.config import get_settings
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED
+
+# Классы эндпоинтов: записи с хешированием пароля, остальные записи и чтения
+ADMISSION_GROUPS = ("hashing", "write", "read")
+REJECT_REASONS = ("queue_full", "timeout")
+
+
+class AdmissionRejected(Exception):
+    """Запрос отклонён: очередь класса заполнена или ожидание слишком долгое."""
+
+    def __init__(self, group: str, reason: str):
+        super().__init__(f"{group}: {reason}")
+        self.group = group
+        self.reason = reason
+
+
+class AdmissionLimiter:
+    """
+    Ограничение одновременных запросов одного класса эндпоинтов.
+    Не больше limit запросов выполняются, не больше queue_size ждут слота
+    не дольше queue_timeout секунд; остальные сразу получают отказ, а не
+    копятся перед пулом хеширования и пулом соединений.
+    Рассчитано на использование из одного цикла событий, без блокировок.
+    """
+
+    def __init__(self, group: str, limit: int, queue_size: int, queue_timeout: float):
+        self.group = group
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        ADMISSION_REJECTED.inc(self.group, reason)
+        return AdmissionRejected(self.group, reason)
+
+    def _set_waiting(self, waiting: int) -> None:
+        self.waiting = waiting
+        ADMISSION_QUEUE_DEPTH.set(waiting, self.group)
+
+    def _set_active(self, active: int) -> None:
+        self.active = active
+        ADMISSION_IN_FLIGHT.set(active, self.group)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Занять слот на время выполнения запроса; при отказе - AdmissionRejected."""
+        if self._semaphore.locked():
+            if self.waiting >= self.queue_size:
+                raise self._reject("queue_full")
+            self._set_waiting(self.waiting + 1)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject("timeout") from None
+            finally:
+                self._set_waiting(self.waiting - 1)
+        else:
+            await self._semaphore.acquire()
+
+        self._set_active(self.active + 1)
+        try:
+            yield
+        finally:
+            self._set_active(self.active - 1)
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": sum(ADMISSION_REJECTED.value(self.group, reason) for reason in REJECT_REASONS),
+        }
+
+
+@lru_cache()
+def get_admission_limiter(group: str) -> AdmissionLimiter | None:
+    """Ограничитель класса эндпоинтов; None, если ограничение выключено."""
+    settings = get_settings()
+    if not settings.ADMISSION_ENABLED:
+        return None
+    prefix = f"ADMISSION_{group.upper()}"
+    return AdmissionLimiter(
+        group,
+        getattr(settings, f"{prefix}_LIMIT"),
+        getattr(settings, f"{prefix}_QUEUE"),
+        settings.ADMISSION_QUEUE_TIMEOUT,
+    )
+
+
+def get_admission_stats() -> dict[str, dict[str, int | float]]:
+    """Состояние ограничителей всех классов эндпоинтов."""
+    limiters = {group: get_admission_limiter(group) for group in ADMISSION_GROUPS}
+    return {group: limiter.stats() for group, limiter in limiters.items() if limiter is not None}
@@ -0,0 +1,129 @@
+import itertools
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from functools import lru_cache
+from typing import Any
+
+from app.core.config import get_settings
+
+
+class Generations:
+    """
+    Поколения ключей: растут при каждом сбросе ключа или всех ключей.
+    Хранятся для последних maxsize сброшенных ключей, у остальных поколение
+    равно наибольшему из вытесненных, поэтому вытеснение может лишь счесть
+    ключ сброшенным лишний раз, но не вернуть ему прежнее поколение.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._values: OrderedDict[Hashable, int] = OrderedDict()
+        self._counter = itertools.count(1)
+        self._floor = 0
+
+    def get(self, key: Hashable) -> int:
+        return self._values.get(key, self._floor)
+
+    def bump(self, key: Hashable) -> None:
+        self._values[key] = next(self._counter)
+        self._values.move_to_end(key)
+        while len(self._values) > self.maxsize:
+            _, generation = self._values.popitem(last=False)
+            self._floor = max(self._floor, generation)
+
+    def bump_all(self) -> None:
+        self._values.clear()
+        self._floor = next(self._counter)
+
+
+class LRUCache:  # pylint: disable=too-many-instance-attributes
+    """
+    LRU-кеш с ограничением по времени жизни записей.
+    Рассчитан на использование из одного цикла событий, без блокировок.
+    Значение, прочитанное из источника, сохраняется с поколением ключа,
+    взятым до чтения: если ключ за время чтения сбросили (invalidate, clear),
+    устаревшее значение не попадёт в кеш.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._generations = Generations(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Получить значение или None, если записи нет или она устарела."""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Any | None:
+        """Значение без учёта в статистике и без изменения порядка вытеснения."""
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            return None
+        return item[1]
+
+    def generation(self, key: Hashable) -> int:
+        """Текущее поколение ключа."""
+        return self._generations.get(key)
+
+    def set(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        """
+        Сохранить значение, вытеснив самую старую запись при переполнении.
+        С generation - только если поколение ключа с тех пор не изменилось.
+        """
+        if generation is not None and generation != self.generation(key):
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Удалить запись и сменить поколение ключа."""
+        self._data.pop(key, None)
+        self._generations.bump(key)
+
+    def clear(self) -> None:
+        """Удалить все записи и сменить поколение всех ключей."""
+        self._data.clear()
+        self._generations.bump_all()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+@lru_cache()
+def get_user_cache() -> LRUCache | None:
+    """Кеш ответов GET /users/{user_id}; None, если кеш выключен."""
+    settings = get_settings()
+    if not settings.USER_CACHE_ENABLED:
+        return None
+    return LRUCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
@@ -0,0 +1,74 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from functools import lru_cache
+from typing import Any
+
+from app.core.config import get_settings
+from app.core.metrics import COALESCED_REQUESTS
+
+
+class SingleFlight:
+    """
+    Объединение одновременных одинаковых чтений (single-flight).
+    Первый запрос по ключу выполняет чтение, остальные, пришедшие до его
+    завершения, получают тот же результат. Рассчитан на использование из
+    одного цикла событий, без блокировок.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Выполнить func или дождаться результата уже идущего чтения по key."""
+        while key in self._calls:
+            future = self._calls[key]
+            COALESCED_REQUESTS.inc(self.group, "shared")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Отменён сам ожидающий - отмена пробрасывается;
+                # отменён ведущий запрос - чтение повторяется
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        COALESCED_REQUESTS.inc(self.group, "leader")
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Ожидающих может не быть: помечаем исключение полученным
+            future.exception()
+            raise
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        future.set_result(result)
+        return result
+
+    def forget(self, predicate: Callable[[Hashable], bool]) -> None:
+        """
+        Отцепить идущие чтения с подходящими ключами: запросы, пришедшие
+        после изменения данных, не получат результат, прочитанный до него.
+        """
+        for key in [key for key in self._calls if predicate(key)]:
+            del self._calls[key]
+
+    def clear(self) -> None:
+        self._calls.clear()
+
+
+@lru_cache()
+def get_single_flight(group: str) -> SingleFlight | None:
+    """Группа объединения чтений; None, если объединение выключено."""
+    if not get_settings().COALESCE_ENABLED:
+        return None
+    return SingleFlight(group)
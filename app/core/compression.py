@@ -0,0 +1,145 @@
+import zlib
+from collections.abc import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость, без неё только gzip
+    brotli = None  # pylint: disable=invalid-name
+
+# Сжатие порции тела: (данные, последняя ли порция) -> сжатые байты
+Encoder = Callable[[bytes, bool], bytes]
+
+# Типы, которые не сжимаются: поток событий должен уходить клиенту без буферизации
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def gzip_encoder(level: int) -> Encoder:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def encode(data: bytes, final: bool) -> bytes:
+        return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    return encode
+
+
+def brotli_encoder(quality: int) -> Encoder:
+    compressor = brotli.Compressor(quality=quality)
+
+    def encode(data: bytes, final: bool) -> bytes:
+        return compressor.process(data) + (compressor.finish() if final else compressor.flush())
+
+    return encode
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Поддерживаемые кодировки в порядке предпочтения."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """Кодировки из Accept-Encoding с их весами q."""
+    weights = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def choose_encoding(header: str, encodings: tuple[str, ...]) -> str | None:
+    """
+    Кодировка ответа по Accept-Encoding: с наибольшим весом, при равных
+    весах - раньше в encodings; None, если клиент ни одну не принимает.
+    """
+    weights = parse_accept_encoding(header)
+    chosen, best = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best:
+            chosen, best = encoding, weight
+    return chosen
+
+
+class CompressionMiddleware:
+    """
+    ASGI-middleware: сжатие ответов gzip или brotli по Accept-Encoding.
+    Ответы одним телом короче minimum_size отдаются как есть. Потоковые
+    ответы сжимаются по порциям со сбросом после каждой, поэтому клиент
+    получает данные по мере чтения, а не после конца выгрузки. Ответы с
+    Content-Encoding (выгрузка в gzip) и потоки событий не трогаются.
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders: dict[str, Callable[[], Encoder]] = {
+            "gzip": lambda: gzip_encoder(gzip_level),
+            "br": lambda: brotli_encoder(brotli_quality),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), available_encodings())
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message = {}
+        encode: Encoder | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, encode, passthrough
+            if message["type"] == "http.response.start":
+                # Заголовки отправляются вместе с первой порцией тела, когда решено, сжимать ли
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if encode is None:
+                headers = MutableHeaders(raw=start["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or content_type.startswith(UNCOMPRESSED_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encode = self.encoders[encoding]()
+                body = encode(body, not more_body)
+                if more_body:
+                    del headers["content-length"]
+                else:
+                    headers["content-length"] = str(len(body))
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                await send(start)
+            else:
+                body = encode(body, not more_body)
+
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
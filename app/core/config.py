@@ -8,6 +8,104 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str
+    # Реплика для читающих эндпоинтов; без неё всё читается с основной БД
+    DATABASE_READ_URL: str | None = None
+
+    # Метрики Prometheus на /metrics
+    METRICS_ENABLED: bool = True
+
+    # Движок и пул соединений
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Ожидание соединения дольше этого порога (в секундах) пишется в лог
+    DB_POOL_WAIT_WARNING: float = 0.1
+    # Таймаут команды asyncpg (в секундах) для любых запросов, включая потоковые
+    DB_COMMAND_TIMEOUT: float = 60.0
+
+    # Бюджет времени запроса по маршрутам (в секундах, 0 - без ограничения): остаток
+    # бюджета ставится statement_timeout каждой транзакции, через DEADLINE_GRACE после
+    # истечения запрос отменяется на стороне приложения. По истечении - 504.
+    # LOOKUP - чтения по id, SEARCH - поиск, FILTER - выборки, статистика и изменения
+    # по фильтру, WRITE - PATCH и DELETE одного пользователя, HASHING - запросы с
+    # хешированием пароля. Массовый импорт, выгрузка и поток изменений без бюджета
+    DEADLINE_ENABLED: bool = True
+    DEADLINE_LOOKUP: float = 1.0
+    DEADLINE_SEARCH: float = 2.0
+    DEADLINE_FILTER: float = 5.0
+    DEADLINE_WRITE: float = 5.0
+    DEADLINE_HASHING: float = 10.0
+    DEADLINE_GRACE: float = 0.5
+
+    # Прогрев при старте: WARMUP_CONNECTIONS соединений пула открываются и
+    # выполняют запросы к users; до окончания прогрева /ready отвечает 503
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: int = 4
+    WARMUP_TIMEOUT: float = 30.0
+    WARMUP_RETRY_INTERVAL: float = 5.0
+
+    # Сжатие ответов gzip или brotli (если установлен пакет brotli) по
+    # Accept-Encoding; ответы одним телом короче COMPRESSION_MINIMUM_SIZE байт не сжимаются
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Пул для хеширования паролей: "thread" или "process"
+    HASH_POOL_KIND: str = "thread"
+    HASH_POOL_SIZE: int = 4
+    HASH_QUEUE_SIZE: int = 64
+    # Стоимость bcrypt; хеши с меньшей стоимостью пересчитываются при входе
+    BCRYPT_ROUNDS: int = 12
+
+    # Ограничение одновременных запросов по классам эндпоинтов: записи с
+    # хешированием пароля, остальные записи и чтения. Сверх LIMIT запросы ждут
+    # в очереди до QUEUE мест, не дольше ADMISSION_QUEUE_TIMEOUT секунд, затем - 503
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_HASHING_LIMIT: int = 8
+    ADMISSION_HASHING_QUEUE: int = 32
+    ADMISSION_WRITE_LIMIT: int = 8
+    ADMISSION_WRITE_QUEUE: int = 64
+    ADMISSION_READ_LIMIT: int = 64
+    ADMISSION_READ_QUEUE: int = 256
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0
+    ADMISSION_RETRY_AFTER: int = 1
+
+    # Размер пачки записей при массовом импорте
+    BULK_CHUNK_SIZE: int = 1000
+    # Максимальная длина записи массового импорта в байтах (строки NDJSON или записи CSV), больше - 413
+    BULK_MAX_RECORD_SIZE: int = 65536
+
+    # Постраничная выдача и потоковый режим /users/user_filter
+    FILTER_MAX_LIMIT: int = 1000
+    FILTER_STREAM_BATCH_SIZE: int = 500
+
+    # Строк на одну порцию потоковой выгрузки /users/export
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Максимум результатов /users/search
+    SEARCH_MAX_LIMIT: int = 50
+
+    # Максимум id в одном запросе /users/batch_get
+    BATCH_GET_MAX_IDS: int = 1000
+
+    # Объединение одновременных одинаковых чтений GET /users/{user_id} и /users/user_filter
+    COALESCE_ENABLED: bool = True
+
+    # Поток изменений /users/changes: пинг и перечитывание журнала без уведомлений,
+    # размер порции и интервал проверки/переподключения соединения LISTEN
+    CHANGES_HEARTBEAT: float = 15.0
+    CHANGES_BATCH_SIZE: int = 500
+    CHANGES_LISTEN_INTERVAL: float = 5.0
+
+    # Кеш ответов GET /users/{user_id}
+    USER_CACHE_ENABLED: bool = False
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 60.0
 
     class Config:
         case_sensitive = True
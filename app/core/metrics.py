@@ -0,0 +1,238 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Счётчик в формате Prometheus."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, labels)} {value}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge:
+    """Текущее значение в формате Prometheus."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, labels)} {value}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами в формате Prometheus."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        # Для каждого набора меток: счётчики по корзинам (+Inf последняя), сумма
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        item = self._values.get(labels)
+        if item is None:
+            item = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = item
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def count(self, *labels: str) -> int:
+        item = self._values.get(labels)
+        return sum(item[0]) if item else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                bucket = _format_labels(self.labels, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {total[0]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Gauge | Histogram] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route", "status"))
+)
+RESPONSE_SIZE = registry.register(
+    Histogram("http_response_size_bytes", "HTTP response body size", ("method", "route"), SIZE_BUCKETS)
+)
+DB_QUERIES_PER_REQUEST = registry.register(
+    Histogram("db_queries_per_request", "SQL statements per HTTP request", ("method", "route"), COUNT_BUCKETS)
+)
+DB_TIME_PER_REQUEST = registry.register(
+    Histogram("db_query_duration_per_request_seconds", "Total SQL time per HTTP request", ("method", "route"))
+)
+DB_QUERY_DURATION = registry.register(
+    Histogram("db_query_duration_seconds", "SQL statement execution time")
+)
+COALESCED_REQUESTS = registry.register(
+    Counter(
+        "coalesced_requests_total",
+        "Reads by single-flight role: leader ran the query, shared reused its result",
+        ("group", "role"),
+    )
+)
+ADMISSION_IN_FLIGHT = registry.register(
+    Gauge("admission_in_flight_requests", "Requests holding an admission slot", ("group",))
+)
+ADMISSION_QUEUE_DEPTH = registry.register(
+    Gauge("admission_queue_depth", "Requests waiting for an admission slot", ("group",))
+)
+ADMISSION_REJECTED = registry.register(
+    Counter(
+        "admission_rejected_total",
+        "Requests rejected by admission control: queue_full or timeout",
+        ("group", "reason"),
+    )
+)
+DEADLINE_ABORTED = registry.register(
+    Counter(
+        "request_deadline_aborted_total",
+        "Requests aborted by deadline: statement_timeout, timeout, pool_timeout or disconnect",
+        ("route", "reason"),
+    )
+)
+PASSWORD_HASH_DURATION = registry.register(
+    Histogram("password_hash_duration_seconds", "Password hashing time including pool wait", ("operation",))
+)
+
+
+@dataclass
+class RequestStats:
+    """Статистика SQL-запросов в рамках одного HTTP-запроса."""
+
+    queries: int = 0
+    db_time: float = 0.0
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def record_query(elapsed: float) -> None:
+    """Учесть выполненный SQL-запрос."""
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+def route_label(scope: Scope) -> str:
+    """Шаблон пути маршрута, чтобы не плодить метки по значениям параметров."""
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: задержка, размер ответа и SQL-запросы по маршрутам."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_stats.reset(token)
+            method, route = scope["method"], route_label(scope)
+            REQUEST_DURATION.observe(time.perf_counter() - started, method, route, str(status_code))
+            RESPONSE_SIZE.observe(size, method, route)
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, method, route)
+            DB_TIME_PER_REQUEST.observe(stats.db_time, method, route)
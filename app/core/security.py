@@ -0,0 +1,153 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+import bcrypt
+
+from app.core.config import get_settings
+from app.core.metrics import PASSWORD_HASH_DURATION
+
+
+class HashingQueueFull(Exception):
+    """Очередь задач хеширования переполнена."""
+
+
+def hash_password(password: str, rounds: int = 12) -> str:
+    """Хешировать пароль (синхронно, выполняется в пуле)."""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def hash_passwords(passwords: list[str], rounds: int = 12) -> list[str]:
+    """Хешировать пачку паролей (синхронно, выполняется в пуле)."""
+    return [hash_password(password, rounds) for password in passwords]
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Проверить пароль по хешу (синхронно, выполняется в пуле)."""
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+    except ValueError:
+        return False
+
+
+def hash_rounds(password_hash: str) -> int:
+    """Стоимость (log2 числа раундов) из хеша bcrypt вида $2b$12$..."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+class PasswordHasher:
+    """
+    Хеширует пароли в ограниченном пуле потоков или процессов,
+    не блокируя цикл событий.
+    """
+
+    def __init__(self, pool_kind: str, pool_size: int, queue_size: int, rounds: int = 12):
+        if pool_kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hash pool kind: {pool_kind}")
+        self.pool_kind = pool_kind
+        self.pool_size = pool_size
+        self.queue_size = queue_size
+        self.rounds = rounds
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._dummy_hash: str | None = None
+
+    @property
+    def pending(self) -> int:
+        """Количество задач в работе и в очереди."""
+        return self._pending
+
+    @property
+    def capacity(self) -> int:
+        """Максимальное количество одновременных задач."""
+        return self.pool_size + self.queue_size
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.pool_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.pool_size)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _run(self, operation: str, func, *args):
+        """Выполнить задачу в пуле, заняв одно место в очереди."""
+        if self._pending >= self.capacity:
+            raise HashingQueueFull()
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+            PASSWORD_HASH_DURATION.observe(time.perf_counter() - started, operation)
+
+    async def hash(self, password: str) -> str:
+        """Хешировать пароль в пуле; при переполнении очереди - HashingQueueFull."""
+        return await self._run("single", hash_password, password, self.rounds)
+
+    async def verify(self, password: str, password_hash: str | None) -> bool:
+        """
+        Проверить пароль в пуле. Без хеша (нет такого пользователя) проверка
+        выполняется по фиктивному хешу, чтобы время ответа не выдавало login.
+        """
+        if password_hash is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = await self.hash("dummy password")
+            await self._run("verify", verify_password, password, self._dummy_hash)
+            return False
+        return await self._run("verify", verify_password, password, password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Хеш вычислен с меньшей стоимостью, чем задана в настройках."""
+        return hash_rounds(password_hash) < self.rounds
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """
+        Хешировать пачку паролей параллельно.
+        Пачка делится не более чем на pool_size частей, каждая часть занимает
+        одно место в очереди.
+        """
+        if not passwords:
+            return []
+        parts = min(self.pool_size, len(passwords))
+        if self._pending + parts > self.capacity:
+            raise HashingQueueFull()
+        size = -(-len(passwords) // parts)
+        slices = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+        self._pending += len(slices)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, hash_passwords, part, self.rounds) for part in slices)
+            )
+        finally:
+            self._pending -= len(slices)
+            PASSWORD_HASH_DURATION.observe(time.perf_counter() - started, "batch")
+        return [password_hash for part in results for password_hash in part]
+
+    def shutdown(self) -> None:
+        """Остановить пул."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+@lru_cache()
+def get_password_hasher() -> PasswordHasher:
+    settings = get_settings()
+    return PasswordHasher(
+        pool_kind=settings.HASH_POOL_KIND,
+        pool_size=settings.HASH_POOL_SIZE,
+        queue_size=settings.HASH_QUEUE_SIZE,
+        rounds=settings.BCRYPT_ROUNDS,
+    )
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.core.config import Settings
+from app.db import base
+from app.db.repository import SqlUserRepository
+from app.schemas.user import UserCreate, UserFilter, UserResponse, UserUpdate
+
+logger = logging.getLogger(__name__)
+
+WARMUP_USER = {
+    "name": "Иван",
+    "surname": "Иванов",
+    "patronymic": None,
+    "type": "student",
+    "class_name": "10A",
+    "login": "warmup",
+    "subject": None,
+}
+
+
+class WarmupState:
+    """Состояние прогрева процесса для /ready."""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.attempts = 0
+        self.duration: float | None = None
+        self.error: str | None = None
+
+    def as_dict(self) -> dict[str, bool | int | float | str | None]:
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "duration": self.duration,
+            "error": self.error,
+        }
+
+
+warmup_state = WarmupState()
+
+
+def exercise_schemas() -> None:
+    """Один раз провести данные через схемы запросов и ответов."""
+    UserCreate.model_validate({**WARMUP_USER, "password": "warmup-password"})
+    UserUpdate.model_validate({"name": WARMUP_USER["name"]})
+    UserFilter.model_validate({"type": WARMUP_USER["type"]})
+    UserResponse.model_validate({**WARMUP_USER, "id": uuid4()}).model_dump(mode="json")
+
+
+async def warm_connection(conn: AsyncConnection) -> None:
+    """
+    Выполнить на соединении основные запросы к users: asyncpg готовит
+    запросы и загружает типы отдельно для каждого соединения.
+    """
+    async with AsyncSession(bind=conn) as session:
+        repository = SqlUserRepository(session)
+        await repository.get(uuid4())
+        await repository.get_credentials(WARMUP_USER["login"])
+        await repository.get_many([uuid4()])
+        await repository.existing_logins({WARMUP_USER["login"]})
+        await repository.find(UserFilter(), None, 1)
+        await repository.find(UserFilter(type=WARMUP_USER["type"]), None, 1)
+        await repository.count(UserFilter())
+        await repository.search(WARMUP_USER["login"], 1)
+
+
+async def warm_engine(engine: AsyncEngine, connections: int) -> None:
+    """Открыть connections соединений пула одновременно и прогреть каждое."""
+    async with AsyncExitStack() as stack:
+        opened = [await stack.enter_async_context(engine.connect()) for _ in range(connections)]
+        for conn in opened:
+            await warm_connection(conn)
+
+
+async def warm_up(config: Settings) -> None:
+    """Прогреть схемы и пулы соединений основной БД и реплики."""
+    started = time.perf_counter()
+    warmup_state.attempts += 1
+    exercise_schemas()
+    connections = max(1, min(config.WARMUP_CONNECTIONS, config.DB_POOL_SIZE))
+    await warm_engine(base.engine, connections)
+    if base.read_engine is not None:
+        await warm_engine(base.read_engine, connections)
+    warmup_state.duration = round(time.perf_counter() - started, 3)
+    warmup_state.error = None
+    warmup_state.ready = True
+
+
+async def keep_warming_up(config: Settings) -> None:
+    """Повторять прогрев, пока он не пройдёт: без БД процесс не готов."""
+    while True:
+        try:
+            await asyncio.wait_for(warm_up(config), config.WARMUP_TIMEOUT)
+            logger.info("Warm-up finished in %.3f s", warmup_state.duration)
+            return
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            warmup_state.error = str(e) or type(e).__name__
+            logger.warning(
+                "Warm-up failed, retrying in %.1f s: %s", config.WARMUP_RETRY_INTERVAL, warmup_state.error
+            )
+        await asyncio.sleep(config.WARMUP_RETRY_INTERVAL)
@@ -1,15 +1,76 @@
+import time
+from typing import Any
+
+from fastapi import Depends, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.core.metrics import record_query
+from app.db.pool import TimedAsyncQueuePool
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-    future=True
-)
+
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+
+def engine_options(config: Settings, database_url: str | None = None) -> dict[str, Any]:
+    """
+    Параметры движка из настроек; database_url - для реплики.
+    Для SQLite (тесты) настройки пула не применяются.
+    """
+    url = make_url(database_url or config.DATABASE_URL)
+    options: dict[str, Any] = {"echo": config.DB_ECHO, "future": True}
+    if url.get_backend_name() == "sqlite":
+        return {"url": url, **options}
+
+    if url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(config.DB_STATEMENT_CACHE_SIZE)}
+        )
+        options["connect_args"] = {"command_timeout": config.DB_COMMAND_TIMEOUT}
+    return {
+        "url": url,
+        **options,
+        "poolclass": TimedAsyncQueuePool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+
+# Время начала хранится в контексте выполнения, а не в conn.info: контекст
+# живёт одно выполнение, и упавший запрос ничего не оставляет на соединении
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    record_query(time.perf_counter() - context.query_started)
+
+
+def _handle_error(exception_context) -> None:
+    """Учесть и запрос, завершившийся ошибкой: его время тоже потрачено БД."""
+    started = getattr(exception_context.execution_context, "query_started", None)
+    if started is not None:
+        record_query(time.perf_counter() - started)
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    """Подключить учёт времени SQL-запросов к движку."""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+engine = create_async_engine(**engine_options(settings))
+if settings.METRICS_ENABLED:
+    instrument_engine(engine.sync_engine)
 
 AsyncSessionLocal = sessionmaker(
     engine,
@@ -17,6 +78,19 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
+read_engine = (
+    create_async_engine(**engine_options(settings, settings.DATABASE_READ_URL))
+    if settings.DATABASE_READ_URL else None
+)
+if read_engine is not None and settings.METRICS_ENABLED:
+    instrument_engine(read_engine.sync_engine)
+
+ReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+) if read_engine is not None else None
+
 Base = declarative_base()
 
 
@@ -29,3 +103,27 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+def prefers_primary(request: Request) -> bool:
+    """
+    Клиент просит читать с основной БД (read-your-writes), например
+    сразу после собственного изменения: реплика может отставать.
+    """
+    return request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true", "yes")
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Зависимость для читающих эндпоинтов: сессия реплики, если она настроена
+    и клиент не запросил чтение с основной БД, иначе - сессия основной БД.
+    Сессия основной БД не берёт соединение из пула, пока не используется.
+    """
+    if ReadSessionLocal is None or prefers_primary(request):
+        yield db
+        return
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
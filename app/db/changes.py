@@ -0,0 +1,65 @@
+import asyncio
+import logging
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.models import CHANGES_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeNotifier:
+    """
+    Будит подписчиков /users/changes, когда в журнале могли появиться
+    изменения: по NOTIFY из БД и по изменениям в самом процессе.
+    Подписчик берёт событие до чтения журнала и ждёт его после,
+    поэтому уведомление между чтением и ожиданием не теряется.
+    """
+
+    def __init__(self) -> None:
+        self._event: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def event(self) -> asyncio.Event:
+        """Событие, которое сработает при следующем уведомлении."""
+        loop = asyncio.get_running_loop()
+        if self._event is None or self._loop is not loop:
+            self._event, self._loop = asyncio.Event(), loop
+        return self._event
+
+    def notify(self) -> None:
+        if self._event is not None:
+            self._event.set()
+            self._event = None
+
+
+change_notifier = ChangeNotifier()
+
+
+async def listen_for_changes(engine: AsyncEngine, retry_interval: float) -> None:
+    """
+    Держать одно соединение процесса с LISTEN на канале журнала и будить
+    подписчиков по NOTIFY. Соединение отдельное от пула, чтобы не занимать
+    его слот и не попадать под pool_recycle. После переподключения
+    подписчики тоже будятся: уведомления за время разрыва потеряны,
+    а изменения остаются в журнале.
+    """
+    url = engine.url.set(drivername="postgresql").difference_update_query(["prepared_statement_cache_size"])
+    dsn = url.render_as_string(hide_password=False)
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(dsn, timeout=retry_interval)
+            await connection.add_listener(CHANGES_CHANNEL, lambda *_: change_notifier.notify())
+            change_notifier.notify()
+            # Проверка соединения: обрыв без трафика иначе не заметен
+            while True:
+                await asyncio.sleep(retry_interval)
+                await connection.execute("SELECT 1", timeout=retry_interval)
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+            logger.warning("LISTEN %s failed, retrying in %.1f s: %s", CHANGES_CHANNEL, retry_interval, e)
+        finally:
+            if connection is not None:
+                connection.terminate()
+        await asyncio.sleep(retry_interval)
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import Receive
+
+from app.core.config import get_settings
+from app.core.metrics import DEADLINE_ABORTED
+
+# SQLSTATE query_canceled: запрос прерван по statement_timeout
+QUERY_CANCELED = "57014"
+
+# Остаток бюджета передаётся параметром: текст запроса один и тот же, и
+# asyncpg не вытесняет из кеша подготовленных запросов запросы к users.
+# set_config(..., true) действует, как SET LOCAL, до конца транзакции
+SET_STATEMENT_TIMEOUT = text("SELECT set_config('statement_timeout', :timeout, true)")
+
+
+class DeadlineExceeded(Exception):
+    """
+    Запрос прерван: statement_timeout, таймаут на стороне приложения или
+    asyncpg, ожидание соединения из пула или отключение клиента.
+    """
+
+    def __init__(self, route: str, reason: str):
+        super().__init__(f"{route}: {reason}")
+        self.route = route
+        self.reason = reason
+
+
+def get_deadline(route: str) -> float | None:
+    """Бюджет времени маршрута в секундах; None - без ограничения."""
+    settings = get_settings()
+    if not settings.DEADLINE_ENABLED:
+        return None
+    return getattr(settings, f"DEADLINE_{route.upper()}") or None
+
+
+def interrupt_reason(error: BaseException | None) -> str | None:
+    """
+    Причина, если ошибка (или одна из ошибок, из-за которых она возникла)
+    вызвана прерыванием запроса к БД; иначе None.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, DBAPIError) and getattr(error.orig, "sqlstate", None) == QUERY_CANCELED:
+            return "statement_timeout"
+        if isinstance(error, PoolTimeoutError):
+            return "pool_timeout"
+        if isinstance(error, TimeoutError):
+            return "timeout"
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def limit_statements(session: AsyncSession, expires: float) -> Callable[[], None]:
+    """
+    Ставить каждой транзакции сессии statement_timeout, равный остатку
+    бюджета до expires (time.monotonic). Значение действует до конца
+    транзакции, поэтому соединение возвращается в пул без него.
+    Возвращает функцию, которая снимает ограничение. Только для PostgreSQL.
+    """
+    if session.bind is None or session.bind.dialect.name != "postgresql":
+        return lambda: None
+
+    def set_statement_timeout(_session, _transaction, connection) -> None:
+        remaining = max(int((expires - time.monotonic()) * 1000), 1)
+        connection.execute(SET_STATEMENT_TIMEOUT, {"timeout": str(remaining)})
+
+    event.listen(session.sync_session, "after_begin", set_statement_timeout)
+    return lambda: event.remove(session.sync_session, "after_begin", set_statement_timeout)
+
+
+async def wait_for_disconnect(receive: Receive) -> None:
+    """Дождаться отключения клиента; тело запроса к этому моменту уже прочитано."""
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+@asynccontextmanager
+async def request_deadline(
+    route: str, budget: float, sessions: Iterable[AsyncSession], receive: Receive
+) -> AsyncIterator[None]:
+    """
+    Выполнять запрос в пределах бюджета budget секунд.
+    БД прерывает запросы по statement_timeout, через DEADLINE_GRACE после
+    истечения бюджета или при отключении клиента запрос отменяется в
+    приложении, и asyncpg отменяет выполняющийся запрос на сервере.
+    Ошибки прерывания превращаются в DeadlineExceeded.
+    """
+    loop = asyncio.get_running_loop()
+    removers = [limit_statements(session, time.monotonic() + budget) for session in set(sessions)]
+    disconnected = False
+
+    def on_disconnect(watcher: asyncio.Task) -> None:
+        nonlocal disconnected
+        if not watcher.cancelled() and watcher.exception() is None:
+            disconnected = True
+            timeout.reschedule(loop.time())
+
+    watcher = asyncio.create_task(wait_for_disconnect(receive))
+    reason = None
+    try:
+        async with asyncio.timeout(budget + get_settings().DEADLINE_GRACE) as timeout:
+            watcher.add_done_callback(on_disconnect)
+            try:
+                yield
+            except Exception as e:
+                reason = interrupt_reason(e)
+                if reason is None:
+                    raise
+                raise DeadlineExceeded(route, reason) from e
+    except TimeoutError as e:
+        if not timeout.expired():
+            raise
+        reason = "disconnect" if disconnected else "timeout"
+        raise DeadlineExceeded(route, reason) from e
+    finally:
+        watcher.remove_done_callback(on_disconnect)
+        watcher.cancel()
+        for remove in removers:
+            remove()
+        if reason is not None:
+            DEADLINE_ABORTED.inc(route, reason)
@@ -0,0 +1,221 @@
+from collections import Counter, namedtuple
+from collections.abc import AsyncIterator, Hashable
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID, uuid4
+
+from app.db.repository import (
+    SEARCH_FIELDS,
+    USER_RESPONSE_FIELDS,
+    ChangePosition,
+    Cursor,
+    LoginAlreadyExists,
+    UserRepository,
+)
+from app.schemas.user import UserFilter
+
+UserRow = namedtuple("UserRow", (*USER_RESPONSE_FIELDS, "version"))
+Credentials = namedtuple("Credentials", ("id", "password_hash"))
+Change = namedtuple("Change", ("txid", "id", "user_id", "op", "changed_at"))
+
+# Поля с индексом «значение -> множество id»; login уникален и индексируется отдельно
+INDEXED_FIELDS = tuple(field for field in UserFilter.model_fields if field != "login")
+
+
+class MemoryUserRepository(UserRepository):
+    """
+    Хранилище пользователей в памяти процесса: для тестов и бенчмарков,
+    которым нужно отделить накладные расходы API и сериализации от БД.
+    Поиск по id и login - словари, по полям фильтра - пересечение индексов.
+    Строки всегда содержат все поля, fields в чтениях не учитывается:
+    ответ сокращается при сериализации.
+    Рассчитано на использование из одного цикла событий, без блокировок.
+    """
+
+    def __init__(self) -> None:
+        self._users: dict[UUID, dict[str, Any]] = {}
+        self._by_login: dict[str, UUID] = {}
+        self._index: dict[str, dict[Any, set[UUID]]] = {field: {} for field in INDEXED_FIELDS}
+        self._changes: list[Change] = []
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    @property
+    def source(self) -> Hashable:
+        return id(self)
+
+    def _add(self, user: dict[str, Any]) -> None:
+        self._users[user["id"]] = user
+        self._by_login[user["login"]] = user["id"]
+        for field in INDEXED_FIELDS:
+            self._index[field].setdefault(user[field], set()).add(user["id"])
+
+    def _remove(self, user_id: UUID) -> dict[str, Any]:
+        user = self._users.pop(user_id)
+        del self._by_login[user["login"]]
+        for field in INDEXED_FIELDS:
+            ids = self._index[field][user[field]]
+            ids.discard(user_id)
+            if not ids:
+                del self._index[field][user[field]]
+        return user
+
+    def _record(self, user_id: UUID, op: str) -> None:
+        """Записать изменение в журнал, как это делают триггеры в БД."""
+        self._changes.append(Change(0, len(self._changes) + 1, user_id, op, datetime.now(timezone.utc)))
+
+    def _match(self, user_filter: UserFilter) -> list[dict[str, Any]]:
+        """Пользователи по фильтру: пересечение индексов, начиная с самого узкого."""
+        filter_data = user_filter.model_dump(exclude_unset=True)
+        if "login" in filter_data:
+            user_id = self._by_login.get(filter_data.pop("login"))
+            candidates = {user_id} if user_id is not None else set()
+        else:
+            candidates = None
+        for ids in sorted(
+            (self._index[field].get(value, set()) for field, value in filter_data.items()), key=len
+        ):
+            candidates = set(ids) if candidates is None else candidates & ids
+        if candidates is None:
+            return list(self._users.values())
+        return [self._users[user_id] for user_id in candidates if user_id in self._users]
+
+    @staticmethod
+    def _row(user: dict[str, Any]) -> UserRow:
+        return UserRow(*(user[field] for field in UserRow._fields))
+
+    def _sorted(self, users: list[dict[str, Any]], after: Cursor | None, limit: int | None) -> list[UserRow]:
+        users = sorted(users, key=lambda user: (user["surname"], user["id"]))
+        if after is not None:
+            users = [user for user in users if (user["surname"], user["id"]) > after]
+        return [self._row(user) for user in users[:limit]]
+
+    def _check_login(self, login: str, user_id: UUID | None = None) -> None:
+        owner = self._by_login.get(login)
+        if owner is not None and owner != user_id:
+            raise LoginAlreadyExists(f"Login {login} already exists")
+
+    async def get(  # pylint: disable=unused-argument
+        self, user_id: UUID, fields: tuple[str, ...] = USER_RESPONSE_FIELDS
+    ) -> UserRow | None:
+        user = self._users.get(user_id)
+        return self._row(user) if user is not None else None
+
+    async def get_credentials(self, login: str) -> Credentials | None:
+        user_id = self._by_login.get(login)
+        if user_id is None:
+            return None
+        return Credentials(user_id, self._users[user_id]["password_hash"])
+
+    async def get_many(self, user_ids: list[UUID]) -> list[UserRow]:
+        return [self._row(self._users[user_id]) for user_id in user_ids if user_id in self._users]
+
+    async def find(  # pylint: disable=unused-argument
+        self,
+        user_filter: UserFilter,
+        after: Cursor | None,
+        limit: int | None,
+        fields: tuple[str, ...] = USER_RESPONSE_FIELDS,
+    ) -> list[UserRow]:
+        return self._sorted(self._match(user_filter), after, limit)
+
+    async def iter_batches(  # pylint: disable=too-many-arguments,invalid-overridden-method,unused-argument
+        self,
+        user_filter: UserFilter,
+        after: Cursor | None,
+        limit: int | None,
+        batch_size: int,
+        ordered: bool = True,
+        fields: tuple[str, ...] = USER_RESPONSE_FIELDS,
+    ) -> AsyncIterator[list[UserRow]]:
+        users = self._match(user_filter)
+        rows = self._sorted(users, after, limit) if ordered else [self._row(user) for user in users]
+        for start in range(0, len(rows), batch_size):
+            yield rows[start:start + batch_size]
+
+    async def search(self, q: str, limit: int) -> list[UserRow]:
+        """Только совпадение по началу строки без учёта регистра, как в SQLite."""
+        prefix = q.casefold()
+        users = [
+            user
+            for user in self._users.values()
+            if any((user[field] or "").casefold().startswith(prefix) for field in SEARCH_FIELDS)
+        ]
+        return self._sorted(users, None, limit)
+
+    async def count(self, user_filter: UserFilter) -> int:
+        return len(self._match(user_filter))
+
+    async def count_groups(self, user_filter: UserFilter, group_by: list[str]) -> list[dict[str, Any]]:
+        counts = Counter(tuple(user[field] for field in group_by) for user in self._match(user_filter))
+        if not counts and not group_by:
+            counts[()] = 0
+        keys = sorted(counts, key=lambda key: [(value is None, value or "") for value in key])
+        return [{**dict(zip(group_by, key)), "count": counts[key]} for key in keys]
+
+    async def existing_logins(self, logins: set[str]) -> set[str]:
+        return {login for login in logins if login in self._by_login}
+
+    async def create(self, values: dict[str, Any]) -> UserRow:
+        self._check_login(values["login"])
+        user = {field: None for field in UserRow._fields}
+        user.update(values, version=1)
+        if user["id"] is None:
+            user["id"] = uuid4()
+        self._add(user)
+        self._record(user["id"], "created")
+        return self._row(user)
+
+    async def create_many(self, values: list[dict[str, Any]]) -> set[str]:
+        created = set()
+        for value in values:
+            if value["login"] not in self._by_login:
+                await self.create(value)
+                created.add(value["login"])
+        return created
+
+    async def update(self, user_id: UUID, values: dict[str, Any], versions: list[int] | None) -> UserRow | None:
+        user = self._users.get(user_id)
+        if user is None or (versions is not None and user["version"] not in versions):
+            return None
+        if "login" in values:
+            self._check_login(values["login"], user_id)
+        self._remove(user_id)
+        user = {**user, **values, "version": user["version"] + 1}
+        self._add(user)
+        self._record(user_id, "updated")
+        return self._row(user)
+
+    async def delete(self, user_id: UUID, versions: list[int] | None) -> bool:
+        user = self._users.get(user_id)
+        if user is None or (versions is not None and user["version"] not in versions):
+            return False
+        self._remove(user_id)
+        self._record(user_id, "deleted")
+        return True
+
+    async def update_where(self, user_filter: UserFilter, values: dict[str, Any]) -> int:
+        users = self._match(user_filter)
+        for user in users:
+            await self.update(user["id"], values, None)
+        return len(users)
+
+    async def delete_where(self, user_filter: UserFilter) -> int:
+        users = self._match(user_filter)
+        for user in users:
+            self._remove(user["id"])
+            self._record(user["id"], "deleted")
+        return len(users)
+
+    async def changes_after(self, position: ChangePosition, limit: int) -> list[Change]:
+        # id изменения на единицу больше его индекса в журнале
+        return self._changes[position[1]:position[1] + limit]
+
+    async def last_change_position(self) -> ChangePosition:
+        return (0, len(self._changes))
+
+    async def replace_password_hash(self, user_id: UUID, old_hash: str, new_hash: str) -> None:
+        user = self._users.get(user_id)
+        if user is not None and user["password_hash"] == old_hash:
+            user["password_hash"] = new_hash
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, String
+from sqlalchemy import DDL, BigInteger, Column, DateTime, Index, Integer, String, UniqueConstraint, event, func
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.db.base import Base
@@ -16,5 +16,114 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     type = Column(String(16), nullable=False)
     class_name = Column(String(8), nullable=True)
-    login = Column(String(255), nullable=False, unique=True)
+    login = Column(String(255), nullable=False)
     subject = Column(String(64), nullable=True)
+    # Версия строки: увеличивается при каждом изменении, используется для ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        UniqueConstraint("login", name="users_login_key"),
+        Index("ix_users_type_class_name", "type", "class_name"),
+        Index("ix_users_class_name", "class_name"),
+        Index("ix_users_surname_name", "surname", "name"),
+        Index("ix_users_surname_id", "surname", "id"),
+        Index("ix_users_name", "name"),
+        Index("ix_users_subject", "subject"),
+        # Триграммные индексы для /users/search (PostgreSQL, расширение pg_trgm)
+        *(
+            Index(
+                f"ix_users_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in ("surname", "name", "patronymic", "login")
+        ),
+    )
+
+
+class UserChange(Base):
+    """
+    Журнал изменений users для GET /users/changes. Строки пишут триггеры
+    на users (см. POSTGRES_CHANGE_TRIGGERS и SQLITE_CHANGE_TRIGGERS),
+    приложение их только читает.
+    """
+    __tablename__ = "user_changes"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    # Транзакция изменения (pg_current_xact_id) для выдачи в порядке фиксации; в SQLite - NULL
+    txid = Column(BigInteger, nullable=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    op = Column(String(16), nullable=False)
+    changed_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()  # pylint: disable=not-callable
+    )
+
+    __table_args__ = (
+        Index("ix_user_changes_txid_id", "txid", "id"),
+    )
+
+
+CHANGES_CHANNEL = "user_changes"
+
+# В PostgreSQL - триггеры на оператор с таблицами переходов и NOTIFY после
+# записи в журнал; пересчёт хеша пароля версию не меняет и в журнал не попадает.
+# Схему рабочей БД задают миграции: 0005 создаёт эти объекты из своей
+# замороженной копии DDL и от этого модуля не зависит. Здесь - копия для
+# create_all (тесты, бенчмарки); при расхождении права миграция. Триггеры
+# меняются новой миграцией, после чего копия здесь приводится к ней же;
+# совпадение с миграцией проверяет tests/db/test_change_triggers.py.
+POSTGRES_CHANGE_TRIGGERS = (
+    """
+    CREATE OR REPLACE FUNCTION record_user_changes() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO user_changes (txid, user_id, op)
+            SELECT pg_current_xact_id()::text::bigint, id, 'created' FROM new_rows;
+        ELSIF TG_OP = 'UPDATE' THEN
+            INSERT INTO user_changes (txid, user_id, op)
+            SELECT pg_current_xact_id()::text::bigint, new_rows.id, 'updated'
+            FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+            WHERE new_rows.version <> old_rows.version;
+        ELSE
+            INSERT INTO user_changes (txid, user_id, op)
+            SELECT pg_current_xact_id()::text::bigint, id, 'deleted' FROM old_rows;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION notify_user_changes() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('user_changes', '');
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "CREATE TRIGGER users_changes_insert AFTER INSERT ON users REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION record_user_changes()",
+    "CREATE TRIGGER users_changes_update AFTER UPDATE ON users "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION record_user_changes()",
+    "CREATE TRIGGER users_changes_delete AFTER DELETE ON users REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION record_user_changes()",
+    "CREATE TRIGGER user_changes_notify AFTER INSERT ON user_changes "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notify_user_changes()",
+)
+
+# В SQLite (тесты) - построчные триггеры без NOTIFY
+SQLITE_CHANGE_TRIGGERS = (
+    "CREATE TRIGGER users_changes_insert AFTER INSERT ON users BEGIN "
+    "INSERT INTO user_changes (user_id, op) VALUES (NEW.id, 'created'); END",
+    "CREATE TRIGGER users_changes_update AFTER UPDATE ON users WHEN NEW.version <> OLD.version BEGIN "
+    "INSERT INTO user_changes (user_id, op) VALUES (NEW.id, 'updated'); END",
+    "CREATE TRIGGER users_changes_delete AFTER DELETE ON users BEGIN "
+    "INSERT INTO user_changes (user_id, op) VALUES (OLD.id, 'deleted'); END",
+)
+
+# Для create_all: триггеры создаются, когда готовы обе таблицы
+for statement in POSTGRES_CHANGE_TRIGGERS:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_CHANGE_TRIGGERS:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,76 @@
+import logging
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Накопленная статистика ожидания соединений из пула."""
+
+    def __init__(self, wait_warning: float) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_warning = wait_warning
+
+    def record(self, wait: float) -> None:
+        self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который замеряет время ожидания соединения.
+    Статистика своя у каждого пула (основная БД и реплика) и переносится
+    в новый пул при engine.dispose().
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats(get_settings().DB_POOL_WAIT_WARNING)
+
+    def recreate(self) -> "TimedAsyncQueuePool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            logger.warning("Connection pool exhausted: %s", self.status())
+            raise
+        wait = time.perf_counter() - started
+        self.stats.record(wait)
+        if wait >= self.stats.wait_warning:
+            logger.warning("Waited %.3f s for a pooled connection: %s", wait, self.status())
+        return connection
+
+
+def get_pool_stats(pool) -> dict[str, int | float | str]:
+    """Текущее состояние пула и накопленная статистика ожидания."""
+    stats: dict[str, int | float | str] = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, TimedAsyncQueuePool):
+        stats.update(
+            checkouts=pool.stats.checkouts,
+            timeouts=pool.stats.timeouts,
+            wait_total_ms=round(pool.stats.wait_total * 1000, 3),
+            wait_max_ms=round(pool.stats.wait_max * 1000, 3),
+        )
+    return stats
@@ -0,0 +1,494 @@
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Hashable
+from typing import Any
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import (
+    BigInteger,
+    Executable,
+    Result,
+    Row,
+    Select,
+    Text,
+    any_,
+    bindparam,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from app.db.base import get_db, get_read_db
+from app.db.models import User, UserChange
+from app.schemas.user import UserFilter, UserResponse
+
+# Колонки ответа в порядке полей UserResponse: ответы собираются прямо из строк
+# результата, без ORM-объектов и повторной валидации своих же данных
+USER_RESPONSE_FIELDS = tuple(UserResponse.model_fields)
+USER_RESPONSE_COLUMNS = tuple(getattr(User, field) for field in USER_RESPONSE_FIELDS)
+# Колонки ответа плюс версия строки для ETag
+USER_ROW_COLUMNS = (*USER_RESPONSE_COLUMNS, User.version)
+
+SEARCH_FIELDS = ("surname", "name", "patronymic", "login")
+SEARCH_COLUMNS = tuple(getattr(User, field) for field in SEARCH_FIELDS)
+
+
+def user_row_columns(fields: tuple[str, ...], *extra: str) -> tuple[ColumnElement, ...]:
+    """Колонки строки только для полей ответа fields, служебных полей extra и версии."""
+    return tuple(getattr(User, name) for name in dict.fromkeys((*fields, *extra, "version")))
+
+
+# Позиция в порядке (surname, id) для постраничной выдачи
+Cursor = tuple[str, UUID]
+
+# Позиция в журнале изменений: (txid, id), в SQLite и в памяти txid = 0
+ChangePosition = tuple[int, int]
+CHANGE_COLUMNS = (UserChange.id, UserChange.user_id, UserChange.op, UserChange.changed_at)
+
+
+class RepositoryError(Exception):
+    """Ошибка хранилища пользователей при изменении данных."""
+
+
+class LoginAlreadyExists(RepositoryError):
+    """Нарушена уникальность login."""
+
+
+class UserRepository(ABC):
+    """
+    Хранилище пользователей.
+    Строки пользователей содержат поля UserResponse и версию (version),
+    учётные данные - id и password_hash. Фильтр - заданные поля UserFilter;
+    None в поле фильтра означает отсутствие значения (NULL).
+    """
+
+    @property
+    @abstractmethod
+    def source(self) -> Hashable:
+        """Источник данных: чтения из разных источников не объединяются."""
+
+    @abstractmethod
+    async def get(self, user_id: UUID, fields: tuple[str, ...] = USER_RESPONSE_FIELDS) -> Row | None:
+        """Пользователь по id; SQL-хранилище читает только колонки fields и версию."""
+
+    @abstractmethod
+    async def get_credentials(self, login: str) -> Row | None:
+        """id и password_hash пользователя по login."""
+
+    @abstractmethod
+    async def get_many(self, user_ids: list[UUID]) -> list[Row]:
+        """Пользователи по списку id, в любом порядке."""
+
+    @abstractmethod
+    async def find(
+        self,
+        user_filter: UserFilter,
+        after: Cursor | None,
+        limit: int | None,
+        fields: tuple[str, ...] = USER_RESPONSE_FIELDS,
+    ) -> list[Row]:
+        """Пользователи по фильтру в порядке (surname, id) после позиции after."""
+
+    @abstractmethod
+    def iter_batches(  # pylint: disable=too-many-arguments
+        self,
+        user_filter: UserFilter,
+        after: Cursor | None,
+        limit: int | None,
+        batch_size: int,
+        ordered: bool = True,
+        fields: tuple[str, ...] = USER_RESPONSE_FIELDS,
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Пользователи по фильтру порциями по batch_size, без ordered - в любом
+        порядке. По завершении итератор освобождает ресурсы хранилища.
+        """
+
+    @abstractmethod
+    async def search(self, q: str, limit: int) -> list[Row]:
+        """Пользователи, у которых фамилия, имя, отчество или login похожи на q."""
+
+    @abstractmethod
+    async def count(self, user_filter: UserFilter) -> int:
+        """Количество пользователей по фильтру."""
+
+    @abstractmethod
+    async def count_groups(self, user_filter: UserFilter, group_by: list[str]) -> list[dict[str, Any]]:
+        """
+        Количество пользователей по фильтру для каждого сочетания значений
+        group_by, по возрастанию значений, отсутствующие значения - последними.
+        """
+
+    @abstractmethod
+    async def existing_logins(self, logins: set[str]) -> set[str]:
+        """Какие из логинов уже заняты."""
+
+    @abstractmethod
+    async def create(self, values: dict[str, Any]) -> Row:
+        """Создать пользователя; при занятом login - LoginAlreadyExists."""
+
+    @abstractmethod
+    async def create_many(self, values: list[dict[str, Any]]) -> set[str]:
+        """
+        Создать пользователей (values содержат id), пропуская тех, чей login
+        занят, в том числе параллельным запросом. Возвращает login созданных.
+        """
+
+    @abstractmethod
+    async def update(self, user_id: UUID, values: dict[str, Any], versions: list[int] | None) -> Row | None:
+        """
+        Изменить пользователя и увеличить его версию; с versions - только если
+        текущая версия среди них. None, если пользователя нет или версия не совпала.
+        """
+
+    @abstractmethod
+    async def delete(self, user_id: UUID, versions: list[int] | None) -> bool:
+        """Удалить пользователя; условие на версию - как в update."""
+
+    @abstractmethod
+    async def update_where(self, user_filter: UserFilter, values: dict[str, Any]) -> int:
+        """Изменить всех пользователей по фильтру; возвращает их количество."""
+
+    @abstractmethod
+    async def delete_where(self, user_filter: UserFilter) -> int:
+        """Удалить всех пользователей по фильтру; возвращает их количество."""
+
+    @abstractmethod
+    async def changes_after(self, position: ChangePosition, limit: int) -> list[Row]:
+        """
+        Изменения пользователей (txid, id, user_id, op, changed_at) после position
+        в порядке фиксации. Завершает транзакцию чтения, чтобы подписчик не держал
+        соединение между опросами.
+        """
+
+    @abstractmethod
+    async def last_change_position(self) -> ChangePosition:
+        """Позиция последнего зафиксированного изменения, (0, 0) для пустого журнала."""
+
+    @abstractmethod
+    async def replace_password_hash(self, user_id: UUID, old_hash: str, new_hash: str) -> None:
+        """Заменить хеш пароля, если он не изменился с момента чтения."""
+
+
+def is_login_conflict(error: IntegrityError) -> bool:
+    """Нарушено ли ограничение уникальности login (users_login_key)."""
+    message = str(error.orig)
+    return "users_login_key" in message or "users.login" in message
+
+
+def write_error(error: Exception) -> RepositoryError:
+    """Исключение хранилища для ошибки изменяющего запроса."""
+    if isinstance(error, IntegrityError) and is_login_conflict(error):
+        return LoginAlreadyExists(str(error))
+    return RepositoryError(str(error))
+
+
+def escape_like(value: str) -> str:
+    """Экранировать спецсимволы LIKE."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_search_query(dialect: str, q: str, limit: int) -> Select:
+    """
+    Поиск по surname, name, patronymic и login без учёта регистра.
+    В PostgreSQL - совпадение по префиксу или триграммное сходство (pg_trgm,
+    GIN-индексы), ранжирование по сходству. В остальных СУБД - только префикс.
+    """
+    prefix = escape_like(q) + "%"
+    prefix_matches = [column.ilike(prefix, escape="\\") for column in SEARCH_COLUMNS]
+    is_prefix = case((or_(*prefix_matches), 1), else_=0)
+    query = select(*USER_ROW_COLUMNS)
+
+    if dialect == "postgresql":
+        fuzzy_matches = [column.op("%")(q) for column in SEARCH_COLUMNS]
+        rank = func.greatest(*(func.similarity(column, q) for column in SEARCH_COLUMNS))
+        query = query.where(or_(*prefix_matches, *fuzzy_matches)).order_by(
+            is_prefix.desc(), rank.desc(), User.surname, User.id
+        )
+    else:
+        query = query.where(or_(*prefix_matches)).order_by(User.surname, User.id)
+    return query.limit(limit)
+
+
+def filter_conditions(user_filter: UserFilter) -> list[ColumnElement[bool]]:
+    """Условия WHERE для заданных полей UserFilter."""
+    filter_data = user_filter.model_dump(exclude_unset=True)
+    return [getattr(User, field) == value for field, value in filter_data.items()]
+
+
+def build_filter_query(
+    user_filter: UserFilter,
+    after: Cursor | None,
+    limit: int | None,
+    ordered: bool = True,
+    fields: tuple[str, ...] = USER_RESPONSE_FIELDS,
+) -> Select:
+    """
+    Запрос пользователей по фильтру в порядке (surname, id) с позиции after.
+    Читаются только колонки fields и (surname, id) для курсора.
+    """
+    filters = filter_conditions(user_filter)
+    if after is not None:
+        filters.append(tuple_(User.surname, User.id) > tuple_(*after))
+    query = select(*user_row_columns(fields, "surname", "id")).where(*filters)
+    if ordered:
+        query = query.order_by(User.surname, User.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def row_conditions(user_id: UUID, versions: list[int] | None) -> list[ColumnElement[bool]]:
+    """Условия WHERE на id и, если задано, на версию строки."""
+    conditions = [User.id == user_id]
+    if versions is not None:
+        conditions.append(User.version.in_(versions))
+    return conditions
+
+
+class SqlUserRepository(UserRepository):
+    """
+    Хранилище пользователей в SQL-БД (PostgreSQL, в тестах - SQLite).
+    Каждое изменение - один запрос и фиксация транзакции.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def source(self) -> Hashable:
+        return self.db.get_bind()
+
+    @property
+    def dialect(self) -> str:
+        return self.db.get_bind().dialect.name
+
+    async def get(self, user_id: UUID, fields: tuple[str, ...] = USER_RESPONSE_FIELDS) -> Row | None:
+        result = await self.db.execute(select(*user_row_columns(fields)).where(User.id == user_id))
+        return result.first()
+
+    async def get_credentials(self, login: str) -> Row | None:
+        result = await self.db.execute(
+            select(User.id, User.password_hash).where(User.login == login)
+        )
+        return result.first()
+
+    async def get_many(self, user_ids: list[UUID]) -> list[Row]:
+        """В PostgreSQL используется id = ANY(:ids) с одним параметром-массивом."""
+        if self.dialect == "postgresql":
+            ids = bindparam("ids", user_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+            condition = User.id == any_(ids)
+        else:
+            condition = User.id.in_(user_ids)
+        result = await self.db.execute(select(*USER_ROW_COLUMNS).where(condition))
+        return list(result.all())
+
+    async def find(
+        self,
+        user_filter: UserFilter,
+        after: Cursor | None,
+        limit: int | None,
+        fields: tuple[str, ...] = USER_RESPONSE_FIELDS,
+    ) -> list[Row]:
+        result = await self.db.execute(build_filter_query(user_filter, after, limit, fields=fields))
+        return list(result.all())
+
+    async def iter_batches(  # pylint: disable=too-many-arguments,invalid-overridden-method
+        self,
+        user_filter: UserFilter,
+        after: Cursor | None,
+        limit: int | None,
+        batch_size: int,
+        ordered: bool = True,
+        fields: tuple[str, ...] = USER_RESPONSE_FIELDS,
+    ) -> AsyncIterator[list[Row]]:
+        """Строки читаются из серверного курсора; сессия закрывается по завершении."""
+        query = build_filter_query(user_filter, after, limit, ordered, fields)
+        try:
+            result = await self.db.stream(query.execution_options(yield_per=batch_size))
+            async for users in result.partitions(batch_size):
+                yield users
+        finally:
+            await self.db.close()
+
+    async def search(self, q: str, limit: int) -> list[Row]:
+        result = await self.db.execute(build_search_query(self.dialect, q, limit))
+        return list(result.all())
+
+    async def count(self, user_filter: UserFilter) -> int:
+        query = (
+            select(func.count())  # pylint: disable=not-callable
+            .select_from(User)
+            .where(*filter_conditions(user_filter))
+        )
+        return (await self.db.execute(query)).scalar_one()
+
+    async def count_groups(self, user_filter: UserFilter, group_by: list[str]) -> list[dict[str, Any]]:
+        """Считается одним запросом GROUP BY, строки пользователей не читаются."""
+        group_columns = [getattr(User, field) for field in group_by]
+        query = (
+            select(*group_columns, func.count().label("count"))  # pylint: disable=not-callable
+            .select_from(User)
+            .where(*filter_conditions(user_filter))
+            .group_by(*group_columns)
+            .order_by(*(column.asc().nulls_last() for column in group_columns))
+        )
+        result = await self.db.execute(query)
+        return [row._asdict() for row in result.all()]
+
+    async def existing_logins(self, logins: set[str]) -> set[str]:
+        result = await self.db.execute(select(User.login).where(User.login.in_(logins)))
+        return set(result.scalars().all())
+
+    async def _write(self, statement: Executable, *params) -> Result:
+        """Выполнить изменяющий запрос и зафиксировать транзакцию."""
+        try:
+            result = await self.db.execute(statement, *params)
+            await self.db.commit()
+            return result
+        except Exception as e:
+            await self.db.rollback()
+            raise write_error(e) from e
+
+    async def _write_returning(self, statement: Executable) -> Row | None:
+        """Выполнить запрос с RETURNING одним обращением к БД; строка RETURNING или None."""
+        try:
+            result = await self.db.execute(statement)
+            row = result.first()
+            await self.db.commit()
+            return row
+        except Exception as e:
+            await self.db.rollback()
+            raise write_error(e) from e
+
+    async def create(self, values: dict[str, Any]) -> Row:
+        return await self._write_returning(insert(User).values(**values).returning(*USER_ROW_COLUMNS))
+
+    async def create_many(self, values: list[dict[str, Any]]) -> set[str]:
+        """Один запрос INSERT ... ON CONFLICT (login) DO NOTHING RETURNING login с пачкой параметров."""
+        dialect_insert = pg_insert if self.dialect == "postgresql" else sqlite_insert
+        statement = dialect_insert(User).on_conflict_do_nothing(index_elements=[User.login]).returning(User.login)
+        try:
+            result = await self.db.execute(statement, values)
+            created = set(result.scalars().all())
+            await self.db.commit()
+            return created
+        except Exception as e:
+            await self.db.rollback()
+            raise write_error(e) from e
+
+    async def update(self, user_id: UUID, values: dict[str, Any], versions: list[int] | None) -> Row | None:
+        """Один запрос UPDATE ... RETURNING, версия проверяется в WHERE."""
+        return await self._write_returning(
+            update(User)
+            .where(*row_conditions(user_id, versions))
+            .values(**values, version=User.version + 1)
+            .returning(*USER_ROW_COLUMNS)
+        )
+
+    async def delete(self, user_id: UUID, versions: list[int] | None) -> bool:
+        row = await self._write_returning(
+            delete(User).where(*row_conditions(user_id, versions)).returning(User.id)
+        )
+        return row is not None
+
+    async def update_where(self, user_filter: UserFilter, values: dict[str, Any]) -> int:
+        result = await self._write(
+            update(User)
+            .where(*filter_conditions(user_filter))
+            .values(**values, version=User.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def delete_where(self, user_filter: UserFilter) -> int:
+        result = await self._write(
+            delete(User)
+            .where(*filter_conditions(user_filter))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def changes_after(self, position: ChangePosition, limit: int) -> list[Row]:
+        """
+        В PostgreSQL id выдаются до фиксации, и меньший id может стать видимым
+        позже большего. Поэтому порядок - (txid, id), и читаются только изменения
+        транзакций, которые старше всех незавершённых. В SQLite запись одна
+        за раз, и порядок id совпадает с порядком фиксации.
+        """
+        if self.dialect == "postgresql":
+            query = (
+                select(UserChange.txid, *CHANGE_COLUMNS)
+                .where(
+                    tuple_(UserChange.txid, UserChange.id)
+                    > tuple_(*(literal(value, BigInteger) for value in position)),
+                    UserChange.txid < snapshot_xmin(),
+                )
+                .order_by(UserChange.txid, UserChange.id)
+            )
+        else:
+            query = (
+                select(func.coalesce(UserChange.txid, 0).label("txid"), *CHANGE_COLUMNS)
+                .where(UserChange.id > position[1])
+                .order_by(UserChange.id)
+            )
+        try:
+            result = await self.db.execute(query.limit(limit))
+            return list(result.all())
+        finally:
+            await self.db.rollback()
+
+    async def last_change_position(self) -> ChangePosition:
+        if self.dialect == "postgresql":
+            query = (
+                select(UserChange.txid, UserChange.id)
+                .where(UserChange.txid < snapshot_xmin())
+                .order_by(UserChange.txid.desc(), UserChange.id.desc())
+                .limit(1)
+            )
+        else:
+            query = select(func.coalesce(UserChange.txid, 0), UserChange.id).order_by(UserChange.id.desc()).limit(1)
+        try:
+            row = (await self.db.execute(query)).first()
+        finally:
+            await self.db.rollback()
+        return (row[0], row[1]) if row else (0, 0)
+
+    async def replace_password_hash(self, user_id: UUID, old_hash: str, new_hash: str) -> None:
+        await self._write(
+            update(User)
+            .where(User.id == user_id, User.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+
+
+def snapshot_xmin() -> ColumnElement:
+    """
+    Самая старая незавершённая транзакция PostgreSQL: все транзакции с меньшим
+    номером завершены, и их изменения в журнале уже не появятся задним числом.
+    """
+    return cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+
+def get_user_repository(db: AsyncSession = Depends(get_db)) -> UserRepository:
+    """Зависимость: хранилище пользователей на основной БД."""
+    return SqlUserRepository(db)
+
+
+def get_read_user_repository(db: AsyncSession = Depends(get_read_db)) -> UserRepository:
+    """Зависимость: хранилище пользователей для чтения (реплика, если настроена)."""
+    return SqlUserRepository(db)
@@ -1,15 +1,48 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.api.v1.api import api_router
+from app.core.admission import get_admission_stats
+from app.core.compression import CompressionMiddleware
 from app.core.config import get_settings
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.security import get_password_hasher
+from app.core.warmup import keep_warming_up, warmup_state
+from app.db.base import engine, read_engine
+from app.db.changes import listen_for_changes
+from app.db.pool import get_pool_stats
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    tasks = []
+    # Прогрев идёт в фоне: /health отвечает сразу, /ready - после прогрева
+    if settings.WARMUP_ENABLED:
+        tasks.append(asyncio.create_task(keep_warming_up(settings)))
+    else:
+        warmup_state.ready = True
+    # NOTIFY есть только в PostgreSQL; без него /users/changes перечитывает журнал по таймеру
+    if engine.dialect.name == "postgresql":
+        tasks.append(asyncio.create_task(listen_for_changes(engine, settings.CHANGES_LISTEN_INTERVAL)))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    get_password_hasher().shutdown()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set up CORS middleware
@@ -21,9 +54,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Метрики добавляются после сжатия и видят размер ответа в сети
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to User API"}
+
+
+@app.get("/health")
+async def health():
+    """Процесс жив и обслуживает запросы; БД не проверяется."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """Готовность принимать трафик: прогрев пула и запросов завершён."""
+    return JSONResponse(
+        warmup_state.as_dict(),
+        status_code=status.HTTP_200_OK if warmup_state.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+@app.get("/pool/stats")
+async def pool_stats():
+    """Состояние пулов соединений с основной БД и с репликой (null, если она не настроена)."""
+    return {
+        "primary": get_pool_stats(engine.pool),
+        "replica": get_pool_stats(read_engine.pool) if read_engine is not None else None,
+    }
+
+
+@app.get("/admission/stats")
+async def admission_stats():
+    """Занятые слоты, очередь и отказы по классам эндпоинтов."""
+    return get_admission_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Метрики в текстовом формате Prometheus."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
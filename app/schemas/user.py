@@ -1,6 +1,9 @@
+from typing import Literal
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field, constr
+from pydantic import BaseModel, ConfigDict, Field, constr, field_validator
+
+from app.core.config import get_settings
 
 
 class UserBase(BaseModel):
@@ -61,3 +64,105 @@ class UserFilter(BaseModel):
     class_name: str | None = Field(None, max_length=8)
     login: str | None = Field(None, max_length=64)
     subject: str | None = Field(None, max_length=64)
+
+
+class UserFilterValues(BaseModel):
+    # login уникален, пароль хешируется по одному - массово их не меняют
+    model_config = ConfigDict(
+        strict=True,
+        str_to_lower=False,
+        validate_assignment=True,
+        extra='forbid'
+    )
+    name: str | None = Field(None, max_length=64)
+    surname: str | None = Field(None, max_length=64)
+    patronymic: str | None = Field(None, max_length=64)
+    type: constr(pattern="^(teacher|student|headteacher)$") | None = None
+    class_name: str | None = Field(None, max_length=8)
+    subject: str | None = Field(None, max_length=64)
+
+    @field_validator("name", "surname", "type", mode="before")
+    @classmethod
+    def reject_null(cls, value):
+        # Колонки NOT NULL: None здесь - только значение по умолчанию (поле не задано)
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+
+class UserFilterUpdate(BaseModel):
+    model_config = ConfigDict(
+        strict=True,
+        extra='forbid'
+    )
+    filter: UserFilter
+    values: UserFilterValues
+
+
+class UserFilterWriteResponse(BaseModel):
+    count: int
+    dry_run: bool
+
+
+class PasswordVerify(BaseModel):
+    model_config = ConfigDict(
+        strict=True,
+        extra='forbid'
+    )
+    login: str = Field(..., max_length=64)
+    password: str = Field(..., max_length=256)
+
+
+class PasswordVerifyResponse(BaseModel):
+    id: UUID
+    valid: bool
+
+
+class UserStatsRequest(BaseModel):
+    model_config = ConfigDict(
+        strict=True,
+        extra='forbid'
+    )
+    filter: UserFilter = Field(default_factory=UserFilter)
+    group_by: list[Literal["type", "class_name", "subject"]] = Field(default_factory=list)
+
+
+class UserStatsGroup(BaseModel):
+    type: str | None = None
+    class_name: str | None = None
+    subject: str | None = None
+    count: int
+
+
+class UserStatsResponse(BaseModel):
+    total: int
+    groups: list[UserStatsGroup]
+
+
+class UserBatchGet(BaseModel):
+    # Без strict: UUID приходят в JSON строками
+    model_config = ConfigDict(extra='forbid')
+    # Предел на сырой список, до отбрасывания повторов: с запасом на дубликаты,
+    # но без разбора UUID из многомегабайтного тела
+    ids: list[UUID] = Field(..., max_length=get_settings().BATCH_GET_MAX_IDS * 10)
+    keep_order: bool = False
+
+
+class UserBatchResponse(BaseModel):
+    users: list[UserResponse]
+    missing: list[UUID]
+
+
+class BulkImportRow(BaseModel):
+    row: int
+    status: Literal["created", "conflict", "invalid"]
+    id: UUID | None = None
+    login: str | None = None
+    detail: str | None = None
+
+
+class BulkImportReport(BaseModel):
+    created: int = 0
+    conflicts: int = 0
+    invalid: int = 0
+    rows: list[BulkImportRow] = []
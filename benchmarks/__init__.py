@@ -0,0 +1,8 @@
+"""
+Бенчмарки API пользователей.
+
+Без DATABASE_URL используется SQLite в памяти.
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
@@ -0,0 +1,103 @@
+"""
+Общие функции бенчмарков.
+"""
+import subprocess
+import uuid
+
+import bcrypt
+from sqlalchemy import delete, insert, text
+
+from app.db.base import Base, engine
+from app.db.models import User
+
+SEED_PASSWORD_HASH = bcrypt.hashpw(b"supersecret", bcrypt.gensalt(4)).decode("utf-8")
+
+SYLLABLES = ("ка", "ло", "ми", "ра", "но", "ве", "ти", "со", "ду", "ре", "га", "па", "ли", "зо", "хи", "ба")
+SURNAME_ENDINGS = ("ов", "ев", "ин", "ский", "ко", "ук")
+
+
+def seed_word(number: int, syllables: int) -> str:
+    """Детерминированное «слово» из слогов по номеру."""
+    parts = []
+    for _ in range(syllables):
+        number, index = divmod(number, len(SYLLABLES))
+        parts.append(SYLLABLES[index])
+    return "".join(parts).capitalize()
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Перцентиль q (0..100) по выборке."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int = 0) -> dict[str, float | int]:
+    """Пропускная способность и перцентили задержки (latencies в секундах)."""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def git_revision() -> str | None:
+    """Текущий коммит, чтобы сравнивать отчёты между ревизиями."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def new_user(prefix: str = "bench") -> dict[str, str | None]:
+    """Данные для создания пользователя с уникальным login."""
+    return {
+        "name": "Иван",
+        "surname": "Иванов",
+        "patronymic": None,
+        "type": "student",
+        "class_name": "10A",
+        "login": f"{prefix}_{uuid.uuid4().hex}",
+        "password": "supersecret",
+        "subject": None,
+    }
+
+
+def seed_rows(count: int) -> list[dict]:
+    """Строки таблицы users с заранее вычисленным хешем пароля."""
+    types = ("student", "teacher", "headteacher")
+    return [
+        {
+            "id": uuid.uuid4(),
+            "name": seed_word(i % 997, 2),
+            "surname": seed_word(i * 7919 % 65536, 4) + SURNAME_ENDINGS[i % len(SURNAME_ENDINGS)],
+            "patronymic": seed_word(i % 499, 2) + "ович",
+            "password_hash": SEED_PASSWORD_HASH,
+            "type": types[min(i % 20, 2)],
+            "class_name": f"{i % 11 + 1}A" if i % 20 == 0 else None,
+            "login": f"seed_{i}",
+            "subject": "Math" if i % 20 == 1 else None,
+        }
+        for i in range(count)
+    ]
+
+
+async def prepare_database(users: int, batch_size: int = 5000) -> list[uuid.UUID]:
+    """Создать таблицы, очистить users и наполнить её users строками."""
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(delete(User))
+    rows = seed_rows(users)
+    for start in range(0, len(rows), batch_size):
+        async with engine.begin() as conn:
+            await conn.execute(insert(User), rows[start:start + batch_size])
+    return [row["id"] for row in rows]
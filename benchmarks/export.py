@@ -0,0 +1,104 @@
+"""
+Память и скорость GET /users/export на таблицах разного размера.
+
+Для каждого размера таблица засеивается заново (она очищается!), выгрузка
+читается потоком прямо из ASGI-приложения (ASGITransport httpx собирает тело
+ответа целиком и исказил бы замер), пиковая память на время выгрузки
+замеряется tracemalloc. При потоковой выгрузке пик не должен расти с
+размером таблицы.
+
+Запуск:
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.export --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import json
+import platform
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+from app.main import app
+from benchmarks.common import git_revision, prepare_database
+
+
+async def export(export_format: str, compress: bool) -> int:
+    """Выполнить GET /users/export, не накапливая тело; вернуть его размер."""
+    query = urlencode({"format": export_format, "gzip": str(compress).lower()})
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/api/v1/users/export",
+        "raw_path": b"/api/v1/users/export", "query_string": query.encode("ascii"),
+        "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    size = 0
+    status_code = 500
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive() -> dict:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal size, status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    if status_code != 200:
+        raise RuntimeError(f"Export failed with status {status_code}")
+    return size
+
+
+async def measure(users: int, export_format: str, compress: bool) -> dict:
+    await prepare_database(users)
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await export(export_format, compress)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "users": users,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(users / elapsed, 2) if elapsed else 0.0,
+        "bytes": size,
+        "peak_memory_mb": round(peak / 2**20, 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> dict:
+    results = [await measure(users, args.format, args.gzip) for users in args.sizes]
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "format": args.format,
+        "gzip": args.gzip,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="*", type=int, default=[10000, 100000])
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--output", help="файл для отчёта (по умолчанию stdout)")
+    cli_args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(main(cli_args)), indent=2)
+    if cli_args.output:
+        with open(cli_args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,80 @@
+"""
+Задержка чтения GET /users/{user_id} при параллельном хешировании паролей.
+
+Запуск:
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.hashing_latency --writers 8
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import get_settings
+from app.main import app
+from benchmarks.common import new_user, percentile, prepare_database
+
+
+async def read_loop(client: AsyncClient, user_id: str, stop: asyncio.Event, latencies: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(f"/api/v1/users/{user_id}")
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+
+
+async def write_loop(client: AsyncClient, stop: asyncio.Event, counter: list[int]) -> None:
+    while not stop.is_set():
+        response = await client.post("/api/v1/users", json=new_user())
+        if response.status_code == 201:
+            counter[0] += 1
+
+
+async def run_phase(client: AsyncClient, user_id: str, readers: int, writers: int, duration: float) -> dict:
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    created = [0]
+    tasks = [asyncio.create_task(read_loop(client, user_id, stop, latencies)) for _ in range(readers)]
+    tasks += [asyncio.create_task(write_loop(client, stop, created)) for _ in range(writers)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return {
+        "writers": writers,
+        "reads": len(latencies),
+        "writes": created[0],
+        "read_p50_ms": round(percentile(latencies, 50), 2),
+        "read_p95_ms": round(percentile(latencies, 95), 2),
+        "read_p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    await prepare_database(0)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/v1/users", json=new_user())
+        response.raise_for_status()
+        user_id = response.json()["id"]
+
+        settings = get_settings()
+        report = {
+            "hash_pool_kind": settings.HASH_POOL_KIND,
+            "hash_pool_size": settings.HASH_POOL_SIZE,
+            "hash_queue_size": settings.HASH_QUEUE_SIZE,
+            "phases": [
+                await run_phase(client, user_id, args.readers, 0, args.duration),
+                await run_phase(client, user_id, args.readers, args.writers, args.duration),
+            ],
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    asyncio.run(main(parser.parse_args()))
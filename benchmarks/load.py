@@ -0,0 +1,183 @@
+"""
+Нагрузочный тест всех эндпоинтов /api/v1/users.
+
+Наполняет таблицу users заданным количеством строк и для каждого эндпоинта
+выполняет фиксированное число запросов с фиксированной конкурентностью.
+Результат - JSON с пропускной способностью и p50/p95/p99 по эндпоинтам.
+
+Запуск:
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.load \\
+        --users 100000 --requests 2000 --concurrency 32 --output bench.json
+
+По умолчанию запросы идут в приложение напрямую через ASGI; с --url -
+по HTTP в запущенный сервис (он должен смотреть в ту же БД). С --backend memory
+маршруты работают с хранилищем в памяти: разница с обычным прогоном - доля БД
+в задержке, остаток - накладные расходы API, валидации и сериализации.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import time
+from collections.abc import Awaitable, Callable
+from uuid import UUID
+
+from httpx import ASGITransport, AsyncClient, Response
+
+from app.db.memory import MemoryUserRepository
+from app.db.repository import get_read_user_repository, get_user_repository
+from app.main import app
+from benchmarks.common import git_revision, new_user, prepare_database, seed_rows, summarize
+
+API = "/api/v1/users"
+
+
+class Context:
+    """Данные, общие для сценариев: id засеянных пользователей."""
+
+    def __init__(self, user_ids: list[UUID], delete_ids: list[UUID]):
+        self.user_ids = [str(user_id) for user_id in user_ids]
+        self.delete_ids = [str(user_id) for user_id in delete_ids]
+
+    def random_id(self) -> str:
+        return random.choice(self.user_ids)
+
+
+Scenario = Callable[[AsyncClient, Context], Awaitable[Response]]
+
+
+async def create(client: AsyncClient, ctx: Context) -> Response:
+    return await client.post(API, json=new_user())
+
+
+async def get(client: AsyncClient, ctx: Context) -> Response:
+    return await client.get(f"{API}/{ctx.random_id()}")
+
+
+async def put(client: AsyncClient, ctx: Context) -> Response:
+    return await client.put(f"{API}/{ctx.random_id()}", json=new_user())
+
+
+async def patch(client: AsyncClient, ctx: Context) -> Response:
+    return await client.patch(f"{API}/{ctx.random_id()}", json={"name": "Пётр"})
+
+
+async def user_filter(client: AsyncClient, ctx: Context) -> Response:
+    # В seed_rows класс есть только у учеников (каждая 20-я строка): 10A - у каждой 220-й
+    return await client.post(
+        f"{API}/user_filter", json={"type": "student", "class_name": "10A"}, params={"limit": 100}
+    )
+
+
+async def batch_get(client: AsyncClient, ctx: Context) -> Response:
+    return await client.post(f"{API}/batch_get", json={"ids": random.sample(ctx.user_ids, 100)})
+
+
+async def delete(client: AsyncClient, ctx: Context) -> Response:
+    return await client.delete(f"{API}/{ctx.delete_ids.pop()}")
+
+
+# delete идёт последним: он расходует отдельный пул id
+SCENARIOS: dict[str, Scenario] = {
+    "create": create,
+    "get": get,
+    "put": put,
+    "patch": patch,
+    "user_filter": user_filter,
+    "batch_get": batch_get,
+    "delete": delete,
+}
+
+
+async def run_scenario(
+    client: AsyncClient, scenario: Scenario, ctx: Context, requests: int, concurrency: int
+) -> dict[str, float | int]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await scenario(client, ctx)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def make_client(url: str | None) -> AsyncClient:
+    if url:
+        return AsyncClient(base_url=url, timeout=60)
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+
+async def prepare_memory(users: int) -> list[UUID]:
+    """Подменить хранилище приложения на хранилище в памяти и наполнить его."""
+    repository = MemoryUserRepository()
+    rows = seed_rows(users)
+    await repository.create_many(rows)
+    app.dependency_overrides[get_user_repository] = lambda: repository
+    app.dependency_overrides[get_read_user_repository] = lambda: repository
+    return [row["id"] for row in rows]
+
+
+async def main(args: argparse.Namespace) -> dict:
+    random.seed(args.seed)
+    names = args.endpoints or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    if args.backend == "memory" and args.url:
+        raise SystemExit("--backend memory works only without --url")
+
+    delete_count = args.requests + args.warmup if "delete" in names else 0
+    prepare = prepare_memory if args.backend == "memory" else prepare_database
+    seeded = await prepare(args.users + delete_count)
+    ctx = Context(seeded[:args.users], seeded[args.users:])
+
+    results = {}
+    async with make_client(args.url) as client:
+        for name in sorted(names, key=list(SCENARIOS).index):
+            if args.warmup:
+                await run_scenario(client, SCENARIOS[name], ctx, args.warmup, 1)
+            results[name] = await run_scenario(client, SCENARIOS[name], ctx, args.requests, args.concurrency)
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "users": args.users,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "target": args.url or "asgi",
+        "backend": args.backend,
+        "seed": args.seed,
+        "endpoints": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000, help="сколько пользователей засеять")
+    parser.add_argument("--requests", type=int, default=500, help="запросов на эндпоинт")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="запросов прогрева на эндпоинт")
+    parser.add_argument("--endpoints", nargs="*", help=f"подмножество из: {', '.join(SCENARIOS)}")
+    parser.add_argument("--url", help="адрес запущенного сервиса вместо ASGI")
+    parser.add_argument("--backend", choices=("db", "memory"), default="db", help="хранилище пользователей")
+    parser.add_argument("--seed", type=int, default=0, help="зерно random: одинаковая последовательность запросов")
+    parser.add_argument("--output", help="файл для отчёта (по умолчанию stdout)")
+    cli_args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(main(cli_args)), indent=2)
+    if cli_args.output:
+        with open(cli_args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
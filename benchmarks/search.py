@@ -0,0 +1,82 @@
+"""
+Задержка GET /users/search на большой таблице.
+
+Запуск (PostgreSQL с применёнными миграциями):
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.search --users 1000000 --reuse
+
+Запросы трёх видов: префикс фамилии, фамилия с опечаткой, префикс login.
+Отчёт содержит p50/p95/p99 по видам и признак укладывания p99 в бюджет.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select, text
+
+from app.db.base import engine
+from app.db.models import User
+from app.main import app
+from benchmarks.common import git_revision, prepare_database, seed_rows, summarize
+
+
+def with_typo(word: str) -> str:
+    """Переставить две соседние буквы."""
+    if len(word) < 4:
+        return word
+    index = random.randrange(1, len(word) - 2)
+    return word[:index] + word[index + 1] + word[index] + word[index + 2:]
+
+
+async def seeded_count() -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(User))).scalar_one()  # pylint: disable=not-callable
+
+
+async def main(args: argparse.Namespace) -> dict:
+    if not (args.reuse and await seeded_count() >= args.users):
+        await prepare_database(args.users)
+        if engine.dialect.name == "postgresql":
+            async with engine.begin() as conn:
+                await conn.execute(text("ANALYZE users"))
+
+    sample = random.sample(seed_rows(min(args.users, 10000)), 200)
+    queries = {
+        "surname_prefix": [row["surname"][:5] for row in sample],
+        "surname_typo": [with_typo(row["surname"]) for row in sample],
+        "login_prefix": [row["login"][:8] for row in sample],
+    }
+
+    results = {}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for kind, terms in queries.items():
+            latencies = []
+            errors = 0
+            started = time.perf_counter()
+            for i in range(args.requests):
+                request_started = time.perf_counter()
+                response = await client.get("/api/v1/users/search", params={"q": terms[i % len(terms)]})
+                latencies.append(time.perf_counter() - request_started)
+                errors += response.status_code != 200
+            results[kind] = summarize(latencies, time.perf_counter() - started, errors)
+            results[kind]["within_budget"] = results[kind]["p99_ms"] <= args.budget_ms
+
+    return {
+        "revision": git_revision(),
+        "dialect": engine.dialect.name,
+        "users": args.users,
+        "budget_ms": args.budget_ms,
+        "queries": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=500, help="запросов каждого вида")
+    parser.add_argument("--budget-ms", type=float, default=20.0)
+    parser.add_argument("--reuse", action="store_true", help="не пересеивать, если строк достаточно")
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
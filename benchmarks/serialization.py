@@ -0,0 +1,73 @@
+"""
+Сериализация больших списков пользователей: путь FastAPI через response_model
+(валидация UserResponse, dump, json.dumps) против сборки JSON из строк
+результата через orjson.
+
+Запуск:
+    python -m benchmarks.serialization --users 10000 --repeat 5
+"""
+import argparse
+import json
+import time
+import uuid
+from collections import namedtuple
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.api.v1.endpoints.users import USER_RESPONSE_FIELDS, serialize_users
+from app.schemas.user import UserResponse
+
+UserRow = namedtuple("UserRow", USER_RESPONSE_FIELDS)
+
+
+def make_rows(count: int) -> list[UserRow]:
+    return [
+        UserRow(
+            name=f"Имя{i}",
+            surname=f"Фамилия{i}",
+            patronymic=None,
+            type="student",
+            class_name="10A",
+            login=f"login_{i}",
+            subject=None,
+            id=uuid.uuid4(),
+        )
+        for i in range(count)
+    ]
+
+
+def fastapi_path(rows: list[UserRow]) -> bytes:
+    adapter = TypeAdapter(list[UserResponse])
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    return JSONResponse(content).body
+
+
+def best_of(func, rows: list[UserRow], repeat: int) -> tuple[float, bytes]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(rows)
+        timings.append(time.perf_counter() - started)
+    return min(timings), body
+
+
+def main(args: argparse.Namespace) -> dict:
+    rows = make_rows(args.users)
+    fastapi_time, fastapi_body = best_of(fastapi_path, rows, args.repeat)
+    fast_time, fast_body = best_of(serialize_users, rows, args.repeat)
+    return {
+        "users": args.users,
+        "fastapi_ms": round(fastapi_time * 1000, 2),
+        "orjson_rows_ms": round(fast_time * 1000, 2),
+        "speedup": round(fastapi_time / fast_time, 1),
+        "identical": fastapi_body == fast_body,
+        "body_bytes": len(fast_body),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    print(json.dumps(main(parser.parse_args()), indent=2))
@@ -0,0 +1,60 @@
+"""
+Пропускная способность проверки пароля bcrypt на одно ядро по стоимостям.
+
+Помогает выбрать BCRYPT_ROUNDS: каждая единица стоимости удваивает время
+проверки, а значит и нагрузку POST /users/verify_password на CPU.
+
+Запуск:
+    python -m benchmarks.verify_password --costs 4 6 8 10 12 --duration 2
+"""
+import argparse
+import json
+import platform
+import time
+
+import bcrypt
+
+from benchmarks.common import git_revision
+
+PASSWORD = b"benchmark password"
+
+
+def measure(cost: int, duration: float) -> dict:
+    password_hash = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(cost))
+    checks = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        bcrypt.checkpw(PASSWORD, password_hash)
+        checks += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "cost": cost,
+        "verifications": checks,
+        "per_second": round(checks / elapsed, 2),
+        "mean_ms": round(elapsed / checks * 1000, 3),
+    }
+
+
+def main(args: argparse.Namespace) -> dict:
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "bcrypt": bcrypt.__version__,
+        "duration": args.duration,
+        "costs": [measure(cost, args.duration) for cost in args.costs],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--costs", nargs="*", type=int, default=[4, 6, 8, 10, 12])
+    parser.add_argument("--duration", type=float, default=2.0, help="секунд на каждую стоимость")
+    parser.add_argument("--output", help="файл для отчёта (по умолчанию stdout)")
+    cli_args = parser.parse_args()
+
+    report = json.dumps(main(cli_args), indent=2)
+    if cli_args.output:
+        with open(cli_args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,43 @@
+"""Начальная схема таблицы users (совпадает с init.sql)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Таблица может быть уже создана из init.sql
+    if sa.inspect(op.get_bind()).has_table("users"):
+        return
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("name", sa.String(64), nullable=False),
+        sa.Column("surname", sa.String(64), nullable=False),
+        sa.Column("patronymic", sa.String(64), nullable=True),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("type", sa.String(16), nullable=False),
+        sa.Column("class_name", sa.String(8), nullable=True),
+        sa.Column("login", sa.String(255), nullable=False),
+        sa.Column("subject", sa.String(64), nullable=True),
+        sa.PrimaryKeyConstraint("id", name="users_pkey"),
+        sa.CheckConstraint("type IN ('teacher', 'student', 'headteacher')", name="valid_user_type"),
+        sa.UniqueConstraint("login", name="users_login_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("users")
@@ -0,0 +1,35 @@
+"""Индексы для полей UserFilter и сортировки (surname, id)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_users_type_class_name": ["type", "class_name"],
+    "ix_users_class_name": ["class_name"],
+    "ix_users_surname_name": ["surname", "name"],
+    "ix_users_surname_id": ["surname", "id"],
+    "ix_users_name": ["name"],
+    "ix_users_subject": ["subject"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES.items():
+        op.create_index(name, "users", columns)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="users")
@@ -0,0 +1,39 @@
+"""Триграммные GIN-индексы для поиска пользователей (pg_trgm)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ("surname", "name", "patronymic", "login")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in COLUMNS:
+        op.create_index(
+            f"ix_users_{column}_trgm",
+            "users",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for column in COLUMNS:
+        op.drop_index(f"ix_users_{column}_trgm", table_name="users")
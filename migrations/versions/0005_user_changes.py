@@ -0,0 +1,99 @@
+"""Журнал изменений users и NOTIFY для GET /users/changes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = {
+    "users_changes_insert": "users",
+    "users_changes_update": "users",
+    "users_changes_delete": "users",
+    "user_changes_notify": "user_changes",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_changes",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("txid", sa.BigInteger(), nullable=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("op", sa.String(16), nullable=False),
+        sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name="user_changes_pkey"),
+    )
+    op.create_index("ix_user_changes_txid_id", "user_changes", ["txid", "id"])
+
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION record_user_changes() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO user_changes (txid, user_id, op)
+                SELECT pg_current_xact_id()::text::bigint, id, 'created' FROM new_rows;
+            ELSIF TG_OP = 'UPDATE' THEN
+                INSERT INTO user_changes (txid, user_id, op)
+                SELECT pg_current_xact_id()::text::bigint, new_rows.id, 'updated'
+                FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+                WHERE new_rows.version <> old_rows.version;
+            ELSE
+                INSERT INTO user_changes (txid, user_id, op)
+                SELECT pg_current_xact_id()::text::bigint, id, 'deleted' FROM old_rows;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_user_changes() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('user_changes', '');
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER users_changes_insert AFTER INSERT ON users REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION record_user_changes()"
+    )
+    op.execute(
+        "CREATE TRIGGER users_changes_update AFTER UPDATE ON users "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION record_user_changes()"
+    )
+    op.execute(
+        "CREATE TRIGGER users_changes_delete AFTER DELETE ON users REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION record_user_changes()"
+    )
+    op.execute(
+        "CREATE TRIGGER user_changes_notify AFTER INSERT ON user_changes "
+        "FOR EACH STATEMENT EXECUTE FUNCTION notify_user_changes()"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for name, table in TRIGGERS.items():
+            op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+        op.execute("DROP FUNCTION IF EXISTS record_user_changes()")
+        op.execute("DROP FUNCTION IF EXISTS notify_user_changes()")
+    op.drop_index("ix_user_changes_txid_id", table_name="user_changes")
+    op.drop_table("user_changes")
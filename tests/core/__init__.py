@@ -0,0 +1,3 @@
+"""
+Тесты общих компонентов приложения.
+"""
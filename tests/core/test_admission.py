@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionLimiter, AdmissionRejected
+from app.core.metrics import ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED
+
+pytestmark = pytest.mark.asyncio
+
+
+async def hold(limiter: AdmissionLimiter, release: asyncio.Event) -> None:
+    async with limiter.slot():
+        await release.wait()
+
+
+async def test_limiter_queues_then_rejects() -> None:
+    """Тест очереди сверх лимита и отказа при заполненной очереди."""
+    limiter = AdmissionLimiter("test_queue", limit=1, queue_size=1, queue_timeout=5)
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(hold(limiter, release)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert limiter.active == 1
+    assert limiter.waiting == 1
+    assert ADMISSION_QUEUE_DEPTH.value("test_queue") == 1
+
+    with pytest.raises(AdmissionRejected) as error:
+        async with limiter.slot():
+            pass
+    assert error.value.reason == "queue_full"
+    assert ADMISSION_REJECTED.value("test_queue", "queue_full") == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert limiter.stats() == {"limit": 1, "queue_size": 1, "active": 0, "waiting": 0, "rejected": 1}
+
+
+async def test_limiter_rejects_after_queue_timeout() -> None:
+    """Тест отказа, если слот не освободился за queue_timeout."""
+    limiter = AdmissionLimiter("test_timeout", limit=1, queue_size=1, queue_timeout=0.01)
+    release = asyncio.Event()
+    task = asyncio.create_task(hold(limiter, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as error:
+        async with limiter.slot():
+            pass
+    assert error.value.reason == "timeout"
+    assert limiter.waiting == 0
+
+    release.set()
+    await task
+    async with limiter.slot():
+        assert limiter.active == 1
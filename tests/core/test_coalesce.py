@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.core.coalesce import SingleFlight
+from app.core.metrics import COALESCED_REQUESTS
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_single_flight_shares_result() -> None:
+    """Тест одного чтения на несколько одновременных запросов."""
+    flight = SingleFlight("test_share")
+    calls = 0
+    release = asyncio.Event()
+
+    async def read() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 42
+
+    tasks = [asyncio.create_task(flight.run("key", read)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*tasks) == [42] * 5
+    assert calls == 1
+    assert len(flight) == 0
+    assert COALESCED_REQUESTS.value("test_share", "leader") == 1
+    assert COALESCED_REQUESTS.value("test_share", "shared") == 4
+
+
+async def test_single_flight_shares_error() -> None:
+    """Тест передачи ошибки чтения всем ожидающим."""
+    flight = SingleFlight("test_error")
+    release = asyncio.Event()
+
+    async def read() -> int:
+        await release.wait()
+        raise ValueError("boom")
+
+    tasks = [asyncio.create_task(flight.run("key", read)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+async def test_single_flight_forget_starts_new_read() -> None:
+    """Тест: после forget новые запросы не присоединяются к старому чтению."""
+    flight = SingleFlight("test_forget")
+    release = asyncio.Event()
+    values = iter(("old", "new"))
+
+    async def read() -> str:
+        value = next(values)
+        if value == "old":
+            await release.wait()
+        return value
+
+    leader = asyncio.create_task(flight.run("key", read))
+    await asyncio.sleep(0)
+    flight.forget(lambda key: key == "key")
+    assert await flight.run("key", read) == "new"
+    release.set()
+    assert await leader == "old"
+
+
+async def test_single_flight_retries_after_leader_cancelled() -> None:
+    """Тест: при отмене ведущего запроса ожидающий выполняет чтение сам."""
+    flight = SingleFlight("test_cancel")
+    release = asyncio.Event()
+    calls = 0
+
+    async def read() -> int:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await release.wait()
+        return calls
+
+    leader = asyncio.create_task(flight.run("key", read))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flight.run("key", read))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await waiter == 2
@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from app.core.compression import CompressionMiddleware, choose_encoding
+
+LARGE = b"x" * 4096
+
+
+async def large(_):
+    return Response(LARGE, media_type="application/json")
+
+
+async def small(_):
+    return Response(b"{}", media_type="application/json")
+
+
+async def stream(_):
+    async def chunks():
+        yield b"["
+        yield LARGE
+        yield b"]"
+
+    return StreamingResponse(chunks(), media_type="application/json")
+
+
+async def events(_):
+    return StreamingResponse(iter([b"data: 1\n\n"]), media_type="text/event-stream")
+
+
+async def encoded(_):
+    return Response(gzip.compress(LARGE), headers={"Content-Encoding": "gzip"})
+
+
+compressed_app = Starlette(
+    routes=[
+        Route(f"/{handler.__name__}", handler)
+        for handler in (large, small, stream, events, encoded)
+    ]
+)
+compressed_app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(app=compressed_app, base_url="http://test") as ac:
+        yield ac
+
+
+def test_choose_encoding() -> None:
+    """Тест выбора кодировки по весам Accept-Encoding."""
+    assert choose_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert choose_encoding("gzip;q=1, br;q=0.5", ("br", "gzip")) == "gzip"
+    assert choose_encoding("br;q=0, *", ("br", "gzip")) == "gzip"
+    assert choose_encoding("identity", ("br", "gzip")) is None
+    assert choose_encoding("", ("gzip",)) is None
+
+
+async def test_large_response_is_gzipped(client: AsyncClient) -> None:
+    """Тест сжатия большого ответа и заголовков Content-Encoding и Vary."""
+    response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(LARGE) // 10
+    assert response.content == LARGE
+
+
+async def test_small_response_is_not_compressed(client: AsyncClient) -> None:
+    """Тест: ответ короче порога отдаётся без сжатия."""
+    response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == b"{}"
+
+
+async def test_without_accept_encoding(client: AsyncClient) -> None:
+    """Тест: клиент без Accept-Encoding получает ответ без сжатия."""
+    response = await client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == LARGE
+
+
+async def test_streaming_response_is_compressed_by_chunks() -> None:
+    """Тест: каждая порция потока сжимается и сбрасывается отдельно."""
+    scope = {
+        "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream",
+        "query_string": b"", "headers": [(b"accept-encoding", b"gzip")],
+    }
+    messages = []
+    done = asyncio.Event()
+
+    async def receive():
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+        if not message.get("more_body", True):
+            done.set()
+
+    await compressed_app(scope, receive, send)
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    decompressor = zlib.decompressobj(wbits=31)
+    parts = [decompressor.decompress(message["body"]) for message in messages[1:]]
+    assert parts[:3] == [b"[", LARGE, b"]"]
+
+
+@pytest.mark.parametrize("path", ["/events", "/encoded"])
+async def test_passthrough(client: AsyncClient, path: str) -> None:
+    """Тест: поток событий и уже сжатые ответы не сжимаются повторно."""
+    response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert response.headers.get("content-encoding") in (None, "gzip")
+    assert "vary" not in response.headers
+    if path == "/encoded":
+        assert response.content == LARGE
+
+
+async def test_brotli(client: AsyncClient) -> None:
+    """Тест сжатия brotli, если установлен пакет brotli."""
+    brotli = pytest.importorskip("brotli")
+    async with client.stream("GET", "/large", headers={"Accept-Encoding": "gzip, br"}) as response:
+        assert response.headers["content-encoding"] == "br"
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    assert brotli.decompress(raw) == LARGE
@@ -0,0 +1,79 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import DB_QUERIES_PER_REQUEST, DB_QUERY_DURATION, REQUEST_DURATION, Histogram
+from app.db import base
+
+USER_DATA = {
+    "name": "Иван",
+    "surname": "Иванов",
+    "type": "student",
+    "class_name": "10A",
+    "login": "ivanov_i",
+    "password": "supersecret",
+}
+
+
+@pytest.fixture
+def instrumented_engine(engine: AsyncEngine) -> AsyncEngine:
+    """Подключает учёт SQL-запросов к тестовому движку."""
+    base.instrument_engine(engine.sync_engine)
+    yield engine
+    event.remove(engine.sync_engine, "before_cursor_execute", base._before_cursor_execute)
+    event.remove(engine.sync_engine, "after_cursor_execute", base._after_cursor_execute)
+    event.remove(engine.sync_engine, "handle_error", base._handle_error)
+
+
+def test_histogram_render() -> None:
+    """Тест вывода гистограммы в формате Prometheus."""
+    histogram = Histogram("test_seconds", "Test", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+    lines = histogram.samples()
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{route="/a"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_metrics_per_route(
+    async_client: AsyncClient,
+    instrumented_engine: AsyncEngine
+) -> None:
+    """Тест учёта задержки и SQL-запросов по шаблону маршрута."""
+    route = "/api/v1/users/{user_id}"
+    requests_before = REQUEST_DURATION.count("GET", route, "200")
+    queries_before = DB_QUERIES_PER_REQUEST.count("GET", route)
+
+    response = await async_client.post("/api/v1/users", json=USER_DATA)
+    user_id = response.json()["id"]
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_200_OK
+
+    assert REQUEST_DURATION.count("GET", route, "200") == requests_before + 1
+    assert DB_QUERIES_PER_REQUEST.count("GET", route) == queries_before + 1
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert f'http_request_duration_seconds_count{{method="GET",route="{route}",status="200"}}' in response.text
+    assert 'db_queries_per_request_bucket{method="GET",route="/api/v1/users/{user_id}",le="1"}' in response.text
+    assert "password_hash_duration_seconds_count" in response.text
+
+
+@pytest.mark.asyncio
+async def test_failed_query_is_recorded(instrumented_engine: AsyncEngine) -> None:
+    """Тест: запрос с ошибкой учитывается и не оставляет время начала на соединении."""
+    before = DB_QUERY_DURATION.count()
+    async with instrumented_engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            await connection.execute(text("SELECT * FROM missing_table"))
+        assert "query_started" not in connection.sync_connection.info
+        await connection.execute(text("SELECT 1"))
+    assert DB_QUERY_DURATION.count() == before + 2
@@ -0,0 +1,68 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import warmup
+from app.core.config import Settings, get_settings
+from app.db import base
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def state(monkeypatch: pytest.MonkeyPatch) -> warmup.WarmupState:
+    """Чистое состояние прогрева на время теста."""
+    state = warmup.WarmupState()
+    monkeypatch.setattr(warmup, "warmup_state", state)
+    monkeypatch.setattr("app.main.warmup_state", state)
+    return state
+
+
+def warmup_settings(**values) -> Settings:
+    return get_settings().model_copy(update=values)
+
+
+async def test_warm_up_marks_ready(
+    engine: AsyncEngine,
+    state: warmup.WarmupState,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест прогрева схем и соединений основной БД."""
+    monkeypatch.setattr(base, "engine", engine)
+    await warmup.warm_up(warmup_settings(WARMUP_CONNECTIONS=2))
+    assert state.ready
+    assert state.attempts == 1
+    assert state.duration is not None
+
+
+async def test_warm_up_retries_until_success(
+    state: warmup.WarmupState,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест повтора прогрева после ошибки."""
+    async def flaky_warm_up(_: Settings) -> None:
+        state.attempts += 1
+        if state.attempts == 1:
+            raise ConnectionError("database is starting")
+        state.ready = True
+
+    monkeypatch.setattr(warmup, "warm_up", flaky_warm_up)
+    await warmup.keep_warming_up(warmup_settings(WARMUP_RETRY_INTERVAL=0))
+    assert state.ready
+    assert state.attempts == 2
+    assert state.error == "database is starting"
+
+
+async def test_ready_and_health(async_client: AsyncClient, state: warmup.WarmupState) -> None:
+    """Тест /ready до и после прогрева и /health без него."""
+    response = await async_client.get("/ready")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["ready"] is False
+
+    response = await async_client.get("/health")
+    assert response.status_code == status.HTTP_200_OK
+
+    state.ready = True
+    response = await async_client.get("/ready")
+    assert response.status_code == status.HTTP_200_OK
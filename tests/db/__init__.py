@@ -0,0 +1,3 @@
+"""
+Тесты работы с базой данных.
+"""
@@ -0,0 +1,41 @@
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.models import POSTGRES_CHANGE_TRIGGERS
+
+MIGRATION = Path(__file__).parents[2] / "migrations" / "versions" / "0005_user_changes.py"
+
+
+class RecordingOp:
+    """Заменяет alembic.op: запоминает выполненный SQL, остальное пропускает."""
+
+    def __init__(self):
+        self.executed: list[str] = []
+
+    def execute(self, statement: str) -> None:
+        self.executed.append(statement)
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def normalize(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+def test_model_triggers_match_migration(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест: копия DDL триггеров для create_all совпадает с DDL миграции 0005."""
+    spec = importlib.util.spec_from_file_location("migration_0005", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    op = RecordingOp()
+    monkeypatch.setattr(migration, "op", op)
+
+    migration.upgrade()
+    assert [normalize(sql) for sql in op.executed] == [normalize(sql) for sql in POSTGRES_CHANGE_TRIGGERS]
@@ -0,0 +1,146 @@
+"""
+Тесты хранилищ пользователей: SQL и в памяти ведут себя одинаково.
+"""
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.memory import MemoryUserRepository
+from app.db.repository import LoginAlreadyExists, SqlUserRepository, UserRepository
+from app.schemas.user import UserFilter
+
+pytestmark = pytest.mark.asyncio
+
+USERS = [
+    ("Иван", "Иванов", "student", "10A", "ivanov_i", None),
+    ("Мария", "Иванова", "student", "10A", "ivanova_m", None),
+    ("Пётр", "Петров", "teacher", None, "petrov_p", "Физика"),
+    ("Анна", "Абрамова", "headteacher", None, "abramova_a", None),
+]
+
+
+def user_values(name, surname, user_type, class_name, login, subject) -> dict:
+    """Значения пользователя в том виде, в каком их передают маршруты."""
+    return {
+        "id": uuid4(),
+        "name": name,
+        "surname": surname,
+        "patronymic": None,
+        "type": user_type,
+        "class_name": class_name,
+        "login": login,
+        "subject": subject,
+        "password_hash": f"hash-{login}",
+    }
+
+
+@pytest.fixture(params=["sql", "memory"])
+async def repository(request, db_session: AsyncSession) -> UserRepository:
+    """Хранилище каждого вида, заполненное пользователями USERS."""
+    if request.param == "sql":
+        repository = SqlUserRepository(db_session)
+    else:
+        repository = MemoryUserRepository()
+    await repository.create_many([user_values(*user) for user in USERS])
+    return repository
+
+
+async def test_find_orders_and_pages(repository: UserRepository) -> None:
+    """Тест фильтра, порядка (surname, id) и продолжения после курсора."""
+    users = await repository.find(UserFilter(type="student"), None, None)
+    assert [user.login for user in users] == ["ivanov_i", "ivanova_m"]
+
+    first_page = await repository.find(UserFilter(), None, 2)
+    assert [user.surname for user in first_page] == ["Абрамова", "Иванов"]
+    last = first_page[-1]
+    second_page = await repository.find(UserFilter(), (last.surname, last.id), 2)
+    assert [user.surname for user in second_page] == ["Иванова", "Петров"]
+
+    assert await repository.find(UserFilter(type="student", class_name="11B"), None, None) == []
+    assert await repository.count(UserFilter(class_name="10A")) == 2
+
+
+async def test_iter_batches(repository: UserRepository) -> None:
+    """Тест чтения по фильтру порциями."""
+    batches = [
+        [user.login for user in batch]
+        async for batch in repository.iter_batches(UserFilter(), None, None, 3)
+    ]
+    assert batches == [["abramova_a", "ivanov_i", "ivanova_m"], ["petrov_p"]]
+
+
+async def test_count_groups(repository: UserRepository) -> None:
+    """Тест группировки: значения по возрастанию, отсутствующие - последними."""
+    groups = await repository.count_groups(UserFilter(), ["class_name"])
+    assert groups == [{"class_name": "10A", "count": 2}, {"class_name": None, "count": 2}]
+    assert await repository.count_groups(UserFilter(login="nobody"), []) == [{"count": 0}]
+
+
+async def test_search_by_prefix(repository: UserRepository) -> None:
+    """Тест поиска по началу login без учёта регистра."""
+    users = await repository.search("IVANOV", 10)
+    assert [user.login for user in users] == ["ivanov_i", "ivanova_m"]
+
+
+async def test_create_conflict(repository: UserRepository) -> None:
+    """Тест отказа при занятом login; пачка пропускает только занятые login."""
+    with pytest.raises(LoginAlreadyExists):
+        await repository.create(user_values(*USERS[0]))
+    created = await repository.create_many(
+        [user_values("Олег", "Олегов", "student", "9B", "olegov_o", None), user_values(*USERS[0])]
+    )
+    assert created == {"olegov_o"}
+    assert await repository.existing_logins({"olegov_o", "petrov_p"}) == {"olegov_o", "petrov_p"}
+    assert len(await repository.find(UserFilter(login=USERS[0][4]), None, None)) == 1
+
+
+async def test_update_and_delete_with_versions(repository: UserRepository) -> None:
+    """Тест изменения и удаления с проверкой версии."""
+    user = (await repository.find(UserFilter(login="petrov_p"), None, None))[0]
+    assert await repository.update(user.id, {"subject": "Химия"}, [user.version + 1]) is None
+
+    updated = await repository.update(user.id, {"subject": "Химия"}, [user.version])
+    assert updated.subject == "Химия"
+    assert updated.version == user.version + 1
+    assert (await repository.get(user.id)).subject == "Химия"
+
+    assert not await repository.delete(user.id, [user.version])
+    assert await repository.delete(user.id, None)
+    assert await repository.get(user.id) is None
+    assert await repository.get_credentials("petrov_p") is None
+
+
+async def test_set_based_writes(repository: UserRepository) -> None:
+    """Тест изменения и удаления по фильтру."""
+    assert await repository.update_where(UserFilter(class_name="10A"), {"class_name": "11A"}) == 2
+    assert await repository.count(UserFilter(class_name="11A")) == 2
+    assert await repository.delete_where(UserFilter(class_name="11A")) == 2
+    assert await repository.count(UserFilter()) == 2
+
+
+async def test_replace_password_hash(repository: UserRepository) -> None:
+    """Тест замены хеша, только если он не изменился с момента проверки."""
+    credentials = await repository.get_credentials("ivanov_i")
+    await repository.replace_password_hash(credentials.id, "stale", "new-hash")
+    assert (await repository.get_credentials("ivanov_i")).password_hash == "hash-ivanov_i"
+    await repository.replace_password_hash(credentials.id, "hash-ivanov_i", "new-hash")
+    assert (await repository.get_credentials("ivanov_i")).password_hash == "new-hash"
+
+
+async def test_changes_log(repository: UserRepository) -> None:
+    """Тест журнала изменений: порядок, продолжение с позиции, без пересчёта хеша."""
+    changes = await repository.changes_after((0, 0), 100)
+    assert [change.op for change in changes] == ["created"] * len(USERS)
+    position = await repository.last_change_position()
+    assert position == (changes[-1].txid, changes[-1].id)
+
+    credentials = await repository.get_credentials("petrov_p")
+    await repository.replace_password_hash(credentials.id, "hash-petrov_p", "new-hash")
+    await repository.update(credentials.id, {"subject": "Химия"}, None)
+    await repository.delete_where(UserFilter(class_name="10A"))
+
+    changes = await repository.changes_after(position, 100)
+    assert [(change.user_id, change.op) for change in changes][:1] == [(credentials.id, "updated")]
+    assert [change.op for change in changes[1:]] == ["deleted", "deleted"]
+    assert await repository.changes_after(position, 1) == changes[:1]
@@ -0,0 +1,67 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.api.v1.endpoints import users
+from app.core.admission import AdmissionLimiter
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def limiters(monkeypatch: pytest.MonkeyPatch) -> dict[str, AdmissionLimiter]:
+    """Отдельные ограничители на тест: без очереди, по одному слоту."""
+    limiters = {
+        group: AdmissionLimiter(group, limit=1, queue_size=0, queue_timeout=1)
+        for group in ("hashing", "write", "read")
+    }
+    monkeypatch.setattr(users, "get_admission_limiter", limiters.get)
+    return limiters
+
+
+async def test_saturated_writes_are_rejected_and_reads_pass(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    limiters: dict[str, AdmissionLimiter]
+) -> None:
+    """Тест быстрого отказа записям при занятом классе и чтений без ожидания."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    user_id = response.json()["id"]
+
+    async with limiters["hashing"].slot():
+        response = await async_client.put(f"/api/v1/users/{user_id}", json=user_data)
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == "1"
+        assert response.json()["detail"] == "Too many hashing requests"
+
+        response = await async_client.get(f"/api/v1/users/{user_id}")
+        assert response.status_code == status.HTTP_200_OK
+        response = await async_client.patch(f"/api/v1/users/{user_id}", json={"name": "Пётр"})
+        assert response.status_code == status.HTTP_200_OK
+
+    assert limiters["hashing"].stats()["rejected"] == 1
+    assert limiters["read"].active == 0
+
+
+async def test_password_patch_is_admitted_as_hashing(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    limiters: dict[str, AdmissionLimiter]
+) -> None:
+    """Тест: PATCH с паролем идёт в класс hashing, без пароля - в класс write."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    user_id = response.json()["id"]
+
+    async with limiters["hashing"].slot():
+        response = await async_client.patch(f"/api/v1/users/{user_id}", json={"password": "newsecret1"})
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["detail"] == "Too many hashing requests"
+
+    async with limiters["write"].slot():
+        response = await async_client.patch(f"/api/v1/users/{user_id}", json={"password": "newsecret1"})
+        assert response.status_code == status.HTTP_200_OK
+        response = await async_client.patch(f"/api/v1/users/{user_id}", json={"name": "Пётр"})
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    response = await async_client.patch(f"/api/v1/users/{user_id}", content=b"")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
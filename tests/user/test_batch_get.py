@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.api.v1.endpoints import users
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_get_users_batch(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест получения пользователей по списку id."""
+    user_ids = []
+    for user_data in users_data:
+        response = await async_client.post("/api/v1/users", json=user_data)
+        user_ids.append(response.json()["id"])
+    missing_id = str(uuid.uuid4())
+
+    ids = [user_ids[2], missing_id, user_ids[0], user_ids[2]]
+    response = await async_client.post(
+        "/api/v1/users/batch_get", json={"ids": ids, "keep_order": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [user["id"] for user in data["users"]] == [user_ids[2], user_ids[0]]
+    assert data["missing"] == [missing_id]
+    for user in data["users"]:
+        assert "password_hash" not in user
+
+
+async def test_get_users_batch_too_many_ids(
+    async_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест ограничения количества id."""
+    monkeypatch.setattr(users.settings, "BATCH_GET_MAX_IDS", 2)
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    response = await async_client.post("/api/v1/users/batch_get", json={"ids": ids})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def test_get_users_batch_raw_ids_limit(async_client: AsyncClient) -> None:
+    """Тест: слишком длинный список id отклоняется ещё при валидации, даже из одних повторов."""
+    limit = users.settings.BATCH_GET_MAX_IDS * 10
+    ids = [str(uuid.uuid4())] * (limit + 1)
+    response = await async_client.post("/api/v1/users/batch_get", json={"ids": ids})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["detail"][0]["type"] == "too_long"
+
+    response = await async_client.post("/api/v1/users/batch_get", json={"ids": ids[:limit]})
+    assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,194 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.core.config import get_settings
+from app.db.repository import RepositoryError, SqlUserRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+def to_ndjson(records: list[dict]) -> str:
+    return "\n".join(json.dumps(record, ensure_ascii=False) for record in records)
+
+
+def to_csv(records: list[dict]) -> str:
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=list(records[0]))
+    writer.writeheader()
+    for record in records:
+        writer.writerow({key: "" if value is None else value for key, value in record.items()})
+    return output.getvalue()
+
+
+async def test_bulk_create_users_ndjson(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест массового создания пользователей из NDJSON."""
+    response = await async_client.post(
+        "/api/v1/users/bulk",
+        content=to_ndjson(users_data),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["created"] == len(users_data)
+    assert report["conflicts"] == 0
+    assert report["invalid"] == 0
+    assert [row["row"] for row in report["rows"]] == [1, 2, 3]
+    assert all(row["id"] for row in report["rows"])
+
+    response = await async_client.post(
+        "/api/v1/users/user_filter", json={"type": "student", "class_name": "10A"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 2
+
+
+async def test_bulk_create_users_csv(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест массового создания пользователей из CSV."""
+    response = await async_client.post(
+        "/api/v1/users/bulk",
+        content=to_csv(users_data),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["created"] == len(users_data)
+
+    user_id = report["rows"][0]["id"]
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["subject"] is None
+
+
+async def test_bulk_create_users_report_conflicts(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест отчёта о конфликтах login и невалидных строках."""
+    create_response = await async_client.post("/api/v1/users", json=user_data)
+    assert create_response.status_code == status.HTTP_201_CREATED
+
+    records = users_data + [users_data[1], {"login": "broken"}]
+    body = to_ndjson(records) + "\n{not json"
+    response = await async_client.post(
+        "/api/v1/users/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    statuses = [row["status"] for row in report["rows"]]
+    assert statuses == ["conflict", "created", "created", "conflict", "invalid", "invalid"]
+    assert report["created"] == 2
+    assert report["conflicts"] == 2
+    assert report["invalid"] == 2
+
+
+async def test_bulk_create_users_non_object_records(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест: строка NDJSON со строкой или списком - невалидная запись, а не текст ошибки."""
+    body = to_ndjson([users_data[0]]) + '\n"abc"\n[1, 2]'
+    response = await async_client.post(
+        "/api/v1/users/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    report = response.json()
+    assert [row["status"] for row in report["rows"]] == ["created", "invalid", "invalid"]
+    assert report["rows"][1]["detail"] != "abc"
+
+
+async def test_bulk_create_users_login_taken_concurrently(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    users_data: list[dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест: логин, занятый после проверки, - конфликт только своей строки."""
+    await async_client.post("/api/v1/users", json=user_data)
+
+    async def existing_logins(*_):
+        return set()
+
+    monkeypatch.setattr(SqlUserRepository, "existing_logins", existing_logins)
+    response = await async_client.post(
+        "/api/v1/users/bulk",
+        content=to_ndjson(users_data),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    report = response.json()
+    assert [row["status"] for row in report["rows"]] == ["conflict", "created", "created"]
+    assert report["rows"][0]["login"] == user_data["login"]
+
+
+async def test_bulk_create_users_storage_error(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест: ошибка хранилища, не связанная с login, - 500, а не конфликты."""
+    async def create_many(*_):
+        raise RepositoryError("connection reset")
+
+    monkeypatch.setattr(SqlUserRepository, "create_many", create_many)
+    response = await async_client.post(
+        "/api/v1/users/bulk",
+        content=to_ndjson(users_data),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+async def test_bulk_create_users_csv_multiline_field(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест: поле CSV в кавычках с переводом строки - часть одной записи."""
+    records = [{**users_data[0], "patronymic": "Первая строка\nвторая"}, users_data[1]]
+    response = await async_client.post(
+        "/api/v1/users/bulk",
+        content=to_csv(records),
+        headers={"Content-Type": "text/csv"},
+    )
+    report = response.json()
+    assert [row["status"] for row in report["rows"]] == ["created", "created"]
+    assert [row["row"] for row in report["rows"]] == [1, 2]
+
+    response = await async_client.get(f"/api/v1/users/{report['rows'][0]['id']}")
+    assert response.json()["patronymic"] == "Первая строка\nвторая"
+
+
+@pytest.mark.parametrize(
+    "content_type, body",
+    [
+        ("application/x-ndjson", "x" * 1000),
+        ("text/csv", "x" * 1000),
+        ("text/csv", 'name,login\nИван,"' + "много строк\n" * 100),
+    ],
+    ids=["ndjson", "csv_line", "csv_unclosed_quote"],
+)
+async def test_bulk_create_users_record_too_long(
+    async_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+    content_type: str,
+    body: str
+) -> None:
+    """Тест ответа 413 на запись длиннее BULK_MAX_RECORD_SIZE, в том числе без перевода строки."""
+    monkeypatch.setattr(get_settings(), "BULK_MAX_RECORD_SIZE", 300)
+    response = await async_client.post(
+        "/api/v1/users/bulk", content=body, headers={"Content-Type": content_type}
+    )
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
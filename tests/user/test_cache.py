@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.api.v1.endpoints import users
+from app.core.cache import LRUCache
+from app.db.memory import MemoryUserRepository
+from app.db.repository import get_read_user_repository, get_user_repository
+from app.main import app
+
+
+@pytest.fixture
+def user_cache(monkeypatch: pytest.MonkeyPatch) -> LRUCache:
+    """Включает кеш GET /users/{user_id} на время теста."""
+    cache = LRUCache(maxsize=100, ttl=60)
+    monkeypatch.setattr(users, "get_user_cache", lambda: cache)
+    return cache
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    """Тест вытеснения самой старой записи."""
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_entries() -> None:
+    """Тест устаревания записей по TTL."""
+    cache = LRUCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_lru_cache_skips_values_read_before_invalidation() -> None:
+    """Тест: значение, прочитанное до сброса ключа, не сохраняется."""
+    cache = LRUCache(maxsize=1, ttl=60)
+    generation = cache.generation("a")
+    cache.invalidate("a")
+    cache.set("a", 1, generation)
+    assert cache.peek("a") is None
+    cache.set("a", 2, cache.generation("a"))
+    assert cache.peek("a") == 2
+
+    generation = cache.generation("a")
+    cache.invalidate("a")
+    cache.invalidate("b")  # вытесняет поколение "a", но не возвращает прежнее
+    cache.set("a", 3, generation)
+    assert cache.peek("a") is None
+
+    generation = cache.generation("c")
+    cache.clear()
+    cache.set("c", 4, generation)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_user_cached(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    partial_update_data: dict[str, str],
+    user_cache: LRUCache
+) -> None:
+    """Тест чтения из кеша и обновления записи при изменении пользователя."""
+    create_response = await async_client.post("/api/v1/users", json=user_data)
+    user_id = create_response.json()["id"]
+
+    first = await async_client.get(f"/api/v1/users/{user_id}")
+    second = await async_client.get(f"/api/v1/users/{user_id}")
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    assert first.content == second.content
+    assert first.json() == create_response.json()
+    assert (user_cache.misses, user_cache.hits) == (1, 1)
+
+    await async_client.patch(f"/api/v1/users/{user_id}", json=partial_update_data)
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.json()["name"] == partial_update_data["name"]
+    assert user_cache.hits == 2
+
+    await async_client.delete(f"/api/v1/users/{user_id}")
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    stats = await async_client.get("/api/v1/users/cache/stats")
+    assert stats.json()["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_update_by_filter_clears_cache(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    user_cache: LRUCache
+) -> None:
+    """Тест очистки кеша при изменении пользователей по фильтру."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    user_id = response.json()["id"]
+    await async_client.get(f"/api/v1/users/{user_id}")
+
+    await async_client.patch(
+        "/api/v1/users/user_filter",
+        json={"filter": {"login": user_data["login"]}, "values": {"class_name": "11A"}},
+    )
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.json()["class_name"] == "11A"
+
+
+@pytest.mark.asyncio
+async def test_delete_during_read_is_not_cached(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    user_cache: LRUCache,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест: чтение, завершившееся после удаления пользователя, не кладёт его в кеш."""
+    repository = MemoryUserRepository()
+    app.dependency_overrides[get_user_repository] = lambda: repository
+    app.dependency_overrides[get_read_user_repository] = lambda: repository
+    response = await async_client.post("/api/v1/users", json=user_data)
+    user_id = response.json()["id"]
+
+    read_done, release = asyncio.Event(), asyncio.Event()
+    get = repository.get
+
+    async def slow_get(*args):
+        user = await get(*args)
+        read_done.set()
+        await release.wait()
+        return user
+
+    monkeypatch.setattr(repository, "get", slow_get)
+    reading = asyncio.create_task(async_client.get(f"/api/v1/users/{user_id}"))
+    await read_done.wait()
+    response = await async_client.delete(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    release.set()
+    assert (await reading).status_code == status.HTTP_200_OK
+
+    assert len(user_cache) == 0
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, status
+from httpx import AsyncClient
+
+from app.api.v1.endpoints import users
+from app.db.memory import MemoryUserRepository
+from app.db.repository import get_read_user_repository, get_user_repository
+from app.main import app
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def repository(override_dependency) -> MemoryUserRepository:
+    """
+    Хранилище в памяти для API и потока: поток читает журнал параллельно
+    с запросами, а тестовая сессия БД одна на всех.
+    """
+    repository = MemoryUserRepository()
+    app.dependency_overrides[get_user_repository] = lambda: repository
+    app.dependency_overrides[get_read_user_repository] = lambda: repository
+    return repository
+
+
+async def read_event(events) -> bytes:
+    return await asyncio.wait_for(anext(events), 1)
+
+
+async def test_changes_stream_resumes_and_follows(
+    async_client: AsyncClient,
+    repository: MemoryUserRepository,
+    user_data: dict[str, str]
+) -> None:
+    """Тест продолжения после Last-Event-ID и событий о новых изменениях."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    user_id = response.json()["id"]
+
+    response = await users.get_changes(last_event_id="0-0", after=None, repository=repository)
+    assert response.media_type == "text/event-stream"
+    events = response.body_iterator
+    try:
+        assert await read_event(events) == b"retry: 3000\n\n"
+        event = await read_event(events)
+        assert event.startswith(b"id: 0-1\nevent: created\n")
+        assert user_id.encode() in event
+
+        next_event = asyncio.create_task(read_event(events))
+        await asyncio.sleep(0)
+        await async_client.patch(f"/api/v1/users/{user_id}", json={"name": "Пётр"})
+        await async_client.delete(f"/api/v1/users/{user_id}")
+        event = await next_event
+        assert b"id: 0-2\nevent: updated\n" in event
+        if b"event: deleted" not in event:
+            event = await read_event(events)
+        assert b"id: 0-3\nevent: deleted\n" in event
+    finally:
+        await events.aclose()
+
+
+async def test_changes_stream_starts_from_now(
+    async_client: AsyncClient,
+    repository: MemoryUserRepository,
+    user_data: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест потока без Last-Event-ID: старые изменения не отдаются, без них - пинг."""
+    await async_client.post("/api/v1/users", json=user_data)
+    monkeypatch.setattr(users.settings, "CHANGES_HEARTBEAT", 0.01)
+
+    response = await users.get_changes(last_event_id=None, after=None, repository=repository)
+    events = response.body_iterator
+    try:
+        assert await read_event(events) == b"retry: 3000\n\n"
+        assert await read_event(events) == b": ping\n\n"
+    finally:
+        await events.aclose()
+
+
+async def test_changes_invalid_event_id(async_client: AsyncClient) -> None:
+    """Тест ответа 400 на некорректный Last-Event-ID."""
+    response = await async_client.get("/api/v1/users/changes", headers={"Last-Event-ID": "abc"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    with pytest.raises(HTTPException):
+        users.decode_change_id("1-x")
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.db.repository import SqlUserRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def slow_reads(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """
+    Первое чтение пользователя ждёт события release, чтобы остальные
+    запросы успели прийти, пока оно идёт.
+    """
+    state = {"calls": 0, "release": asyncio.Event()}
+    get = SqlUserRepository.get
+
+    async def slow_get(repository, user_id, *args):
+        state["calls"] += 1
+        if state["calls"] == 1:
+            await state["release"].wait()
+        return await get(repository, user_id, *args)
+
+    monkeypatch.setattr(SqlUserRepository, "get", slow_get)
+    return state
+
+
+async def test_concurrent_reads_are_coalesced(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    slow_reads: dict
+) -> None:
+    """Тест одного запроса к БД на одновременные GET одного пользователя."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    user_id = response.json()["id"]
+
+    tasks = [
+        asyncio.create_task(async_client.get(f"/api/v1/users/{user_id}")) for _ in range(3)
+    ]
+    await asyncio.sleep(0.05)
+    slow_reads["release"].set()
+    responses = await asyncio.gather(*tasks)
+    assert [response.status_code for response in responses] == [status.HTTP_200_OK] * 3
+    assert slow_reads["calls"] == 1
+
+
+async def test_write_breaks_inflight_read(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    slow_reads: dict
+) -> None:
+    """Тест: чтение после изменения не получает результат начатого до него."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    user_id = response.json()["id"]
+
+    first = asyncio.create_task(async_client.get(f"/api/v1/users/{user_id}"))
+    await asyncio.sleep(0.05)
+    response = await async_client.patch(f"/api/v1/users/{user_id}", json={"name": "Пётр"})
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.json()["name"] == "Пётр"
+    assert slow_reads["calls"] == 2
+    slow_reads["release"].set()
+    await first
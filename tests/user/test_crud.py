@@ -1,6 +1,8 @@
 import pytest
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 
 pytestmark = pytest.mark.asyncio
@@ -154,3 +156,76 @@ async def test_get_users(
                 assert data_user[key] == user_filter[key]
         assert "password" not in data_user
         assert "password_hash" not in data_user
+
+
+@pytest.mark.asyncio
+async def test_create_user_duplicate_login(
+    async_client: AsyncClient,
+    user_data: dict[str, str]
+) -> None:
+    """Тест создания пользователя с занятым login."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = await async_client.post("/api/v1/users", json=user_data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "User with this login already exists"
+
+
+@pytest.mark.asyncio
+async def test_update_user_duplicate_login(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест смены login на занятый."""
+    user_ids = []
+    for user_data in users_data[:2]:
+        response = await async_client.post("/api/v1/users", json=user_data)
+        user_ids.append(response.json()["id"])
+
+    response = await async_client.patch(
+        f"/api/v1/users/{user_ids[1]}",
+        json={"login": users_data[0]["login"]}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_write_missing_user(
+    async_client: AsyncClient,
+    updated_user_data: dict[str, str],
+    partial_update_data: dict[str, str]
+) -> None:
+    """Тест изменения несуществующего пользователя."""
+    user_id = "00000000-0000-0000-0000-000000000000"
+    response = await async_client.put(f"/api/v1/users/{user_id}", json=updated_user_data)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await async_client.patch(f"/api/v1/users/{user_id}", json=partial_update_data)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await async_client.delete(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_writes_use_single_statement(
+    async_client: AsyncClient,
+    engine: AsyncEngine,
+    user_data: dict[str, str],
+    partial_update_data: dict[str, str]
+) -> None:
+    """Тест выполнения каждой записи одним SQL-запросом."""
+    statements: list[str] = []
+
+    def before_execute(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_execute)
+    try:
+        response = await async_client.post("/api/v1/users", json=user_data)
+        user_id = response.json()["id"]
+        await async_client.patch(f"/api/v1/users/{user_id}", json=partial_update_data)
+        await async_client.delete(f"/api/v1/users/{user_id}")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_execute)
+
+    assert [statement.split()[0] for statement in statements] == ["INSERT", "UPDATE", "DELETE"]
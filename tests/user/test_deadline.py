@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import get_settings
+from app.core.metrics import DEADLINE_ABORTED
+from app.db.repository import SqlUserRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+class QueryCanceled(Exception):
+    """Ошибка драйвера с SQLSTATE query_canceled, как при statement_timeout."""
+
+    sqlstate = "57014"
+
+
+async def create_user(async_client: AsyncClient, user_data: dict[str, str]) -> str:
+    response = await async_client.post("/api/v1/users", json=user_data)
+    return response.json()["id"]
+
+
+def fail_reads(monkeypatch: pytest.MonkeyPatch, error: Exception) -> None:
+    async def get(*_):
+        raise error
+
+    monkeypatch.setattr(SqlUserRepository, "get", get)
+
+
+async def test_slow_read_gets_504(
+    async_client: AsyncClient, user_data: dict[str, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест: чтение дольше бюджета маршрута отменяется, ответ - 504."""
+    user_id = await create_user(async_client, user_data)
+    monkeypatch.setattr(get_settings(), "DEADLINE_LOOKUP", 0.01)
+    monkeypatch.setattr(get_settings(), "DEADLINE_GRACE", 0.01)
+    cancelled = asyncio.Event()
+
+    async def slow_get(*_):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(SqlUserRepository, "get", slow_get)
+    before = DEADLINE_ABORTED.value("lookup", "timeout")
+
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+    assert response.json()["detail"] == "Request deadline exceeded"
+    assert cancelled.is_set()
+    assert DEADLINE_ABORTED.value("lookup", "timeout") == before + 1
+
+
+async def test_statement_timeout_gets_504(
+    async_client: AsyncClient, user_data: dict[str, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест: запрос, прерванный БД по statement_timeout, - 504, в том числе при записи."""
+    user_id = await create_user(async_client, user_data)
+    error = OperationalError("SELECT", {}, QueryCanceled())
+    fail_reads(monkeypatch, error)
+    before = DEADLINE_ABORTED.value("lookup", "statement_timeout")
+
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+    assert DEADLINE_ABORTED.value("lookup", "statement_timeout") == before + 1
+
+    async def update(*_):
+        raise error
+
+    monkeypatch.setattr(SqlUserRepository, "_write_returning", update)
+    response = await async_client.patch(f"/api/v1/users/{user_id}", json={"name": "Пётр"})
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+
+
+async def test_pool_timeout_gets_503(
+    async_client: AsyncClient, user_data: dict[str, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест: нет свободного соединения в пуле - 503 с Retry-After."""
+    user_id = await create_user(async_client, user_data)
+    fail_reads(monkeypatch, PoolTimeoutError("QueuePool limit reached"))
+
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert "Retry-After" in response.headers
+
+
+async def test_other_errors_are_not_translated(
+    async_client: AsyncClient, user_data: dict[str, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест: ошибки, не связанные с прерыванием запроса, не превращаются в 503/504."""
+    user_id = await create_user(async_client, user_data)
+    fail_reads(monkeypatch, OperationalError("SELECT", {}, Exception("connection reset")))
+
+    with pytest.raises(OperationalError):
+        await async_client.get(f"/api/v1/users/{user_id}")
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_get_user_not_modified(
+    async_client: AsyncClient,
+    user_data: dict[str, str]
+) -> None:
+    """Тест ETag и ответа 304 на If-None-Match."""
+    create_response = await async_client.post("/api/v1/users", json=user_data)
+    etag = create_response.headers["ETag"]
+    user_id = create_response.json()["id"]
+
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.headers["ETag"] == etag
+
+    response = await async_client.get(
+        f"/api/v1/users/{user_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+    response = await async_client.get(
+        f"/api/v1/users/{user_id}", headers={"If-None-Match": '"999"'}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+async def test_update_user_if_match(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    updated_user_data: dict[str, str],
+    partial_update_data: dict[str, str]
+) -> None:
+    """Тест отказа 412 при изменении устаревшей версии."""
+    create_response = await async_client.post("/api/v1/users", json=user_data)
+    etag = create_response.headers["ETag"]
+    user_id = create_response.json()["id"]
+
+    response = await async_client.patch(
+        f"/api/v1/users/{user_id}", json=partial_update_data, headers={"If-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+
+    response = await async_client.put(
+        f"/api/v1/users/{user_id}", json=updated_user_data, headers={"If-Match": etag}
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    response = await async_client.delete(f"/api/v1/users/{user_id}", headers={"If-Match": etag})
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.json()["name"] == partial_update_data["name"]
+
+    response = await async_client.delete(f"/api/v1/users/{user_id}", headers={"If-Match": new_etag})
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = await async_client.delete(f"/api/v1/users/{user_id}", headers={"If-Match": new_etag})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
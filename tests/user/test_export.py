@@ -0,0 +1,78 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.api.v1.endpoints import users
+
+pytestmark = pytest.mark.asyncio
+
+
+async def create_users(async_client: AsyncClient, users_data: list[dict[str, str]]) -> dict[str, str]:
+    ids = {}
+    for user_data in users_data:
+        response = await async_client.post("/api/v1/users", json=user_data)
+        ids[user_data["login"]] = response.json()["id"]
+    return ids
+
+
+async def test_export_ndjson(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест выгрузки в NDJSON порциями меньше размера таблицы."""
+    monkeypatch.setattr(users.settings, "EXPORT_BATCH_SIZE", 2)
+    ids = await create_users(async_client, users_data)
+
+    response = await async_client.get("/api/v1/users/export")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {row["login"]: row["id"] for row in rows} == ids
+    assert "password_hash" not in rows[0]
+
+
+async def test_export_csv_with_filter(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест выгрузки в CSV по фильтру."""
+    ids = await create_users(async_client, users_data)
+
+    response = await async_client.get(
+        "/api/v1/users/export", params={"format": "csv", "type": "student"}
+    )
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert sorted(row["login"] for row in rows) == ["ivanov_i", "petr_petrov"]
+    assert rows[0]["id"] == ids[rows[0]["login"]]
+
+    response = await async_client.get(
+        "/api/v1/users/export", params={"format": "csv", "type": "nobody"}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def test_export_gzip(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест сжатой выгрузки, в том числе пустой."""
+    await create_users(async_client, users_data)
+
+    async with async_client.stream(
+        "GET", "/api/v1/users/export", params={"format": "csv", "gzip": True}
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        body = gzip.decompress(b"".join([chunk async for chunk in response.aiter_raw()]))
+    assert len(body.decode("utf-8").splitlines()) == 4
+
+    response = await async_client.get(
+        "/api/v1/users/export", params={"format": "csv", "gzip": True, "login": "nobody"}
+    )
+    assert response.text.splitlines() == [",".join(users.USER_RESPONSE_FIELDS)]
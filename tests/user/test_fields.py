@@ -0,0 +1,60 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.db.repository import build_filter_query
+from app.schemas.user import UserFilter
+
+
+@pytest.mark.asyncio
+async def test_get_user_fields(async_client: AsyncClient, user_data: dict[str, str]) -> None:
+    """Тест GET /users/{user_id} с fields: только перечисленные поля и тот же ETag."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    user = response.json()
+
+    response = await async_client.get(f"/api/v1/users/{user['id']}", params={"fields": "surname, id,name"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"id": user["id"], "name": user["name"], "surname": user["surname"]}
+    assert response.headers["ETag"] == '"1"'
+
+
+@pytest.mark.asyncio
+async def test_user_filter_fields(
+    async_client: AsyncClient, users_data: list[dict[str, str]]
+) -> None:
+    """Тест /users/user_filter с fields в постраничном и потоковом режимах."""
+    for data in users_data:
+        await async_client.post("/api/v1/users", json=data)
+
+    response = await async_client.post(
+        "/api/v1/users/user_filter", params={"fields": "id,surname", "limit": 1}, json={}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.json()[0]) == {"id", "surname"}
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = await async_client.post(
+        "/api/v1/users/user_filter", params={"fields": "login", "after": cursor}, json={}
+    )
+    assert [list(user) for user in response.json()] == [["login"]] * (len(users_data) - 1)
+
+    response = await async_client.post(
+        "/api/v1/users/user_filter", params={"fields": "name", "stream": True}, json={}
+    )
+    assert sorted(user["name"] for user in response.json()) == sorted(data["name"] for data in users_data)
+
+
+@pytest.mark.parametrize("fields", ["password_hash", "id,unknown", " , "])
+@pytest.mark.asyncio
+async def test_invalid_fields(async_client: AsyncClient, fields: str) -> None:
+    """Тест ошибки 400 для неизвестных и пустых полей."""
+    response = await async_client.post("/api/v1/users/user_filter", params={"fields": fields}, json={})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_filter_query_reads_requested_columns() -> None:
+    """Тест: запрос читает только поля fields, (surname, id) для курсора и версию."""
+    query = build_filter_query(UserFilter(type="student"), None, 10, fields=("name",))
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert sql.split("FROM")[0].strip() == "SELECT users.name, users.surname, users.id, users.version"
@@ -0,0 +1,59 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def create_users(async_client: AsyncClient, users_data: list[dict[str, str]]) -> None:
+    for user_data in users_data:
+        response = await async_client.post("/api/v1/users", json=user_data)
+        assert response.status_code == status.HTTP_201_CREATED
+
+
+async def test_get_users_paginated(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест постраничной выдачи пользователей по курсору."""
+    await create_users(async_client, users_data)
+
+    surnames = []
+    after = None
+    for _ in range(len(users_data)):
+        params = {"limit": 2}
+        if after:
+            params["after"] = after
+        response = await async_client.post("/api/v1/users/user_filter", json={}, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        surnames += [user["surname"] for user in response.json()]
+        after = response.headers.get("X-Next-Cursor")
+        if after is None:
+            break
+
+    assert surnames == sorted(user["surname"] for user in users_data)
+
+
+async def test_get_users_invalid_cursor(async_client: AsyncClient) -> None:
+    """Тест ошибки при некорректном курсоре."""
+    response = await async_client.post(
+        "/api/v1/users/user_filter", json={}, params={"after": "broken"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_get_users_stream(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест потоковой выдачи пользователей."""
+    await create_users(async_client, users_data)
+
+    response = await async_client.post(
+        "/api/v1/users/user_filter", json={"type": "student"}, params={"stream": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [user["surname"] for user in data] == ["Иванов", "Петров"]
+    for user in data:
+        assert "password_hash" not in user
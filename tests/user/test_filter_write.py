@@ -0,0 +1,105 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+STUDENTS_10A = {"type": "student", "class_name": "10A"}
+
+
+async def create_users(async_client: AsyncClient, users_data: list[dict[str, str]]) -> list[dict]:
+    users = []
+    for user_data in users_data:
+        response = await async_client.post("/api/v1/users", json=user_data)
+        assert response.status_code == status.HTTP_201_CREATED
+        users.append(response.json())
+    return users
+
+
+async def test_update_users_by_filter(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест перевода класса одним UPDATE с увеличением версии."""
+    users = await create_users(async_client, users_data)
+
+    response = await async_client.request(
+        "PATCH", "/api/v1/users/user_filter",
+        json={"filter": STUDENTS_10A, "values": {"class_name": "11A"}},
+        params={"dry_run": True},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"count": 2, "dry_run": True}
+
+    response = await async_client.get(f"/api/v1/users/{users[0]['id']}")
+    assert response.json()["class_name"] == "10A"
+    assert response.headers["ETag"] == '"1"'
+
+    response = await async_client.patch(
+        "/api/v1/users/user_filter",
+        json={"filter": STUDENTS_10A, "values": {"class_name": "11A"}},
+    )
+    assert response.json() == {"count": 2, "dry_run": False}
+
+    response = await async_client.get(f"/api/v1/users/{users[0]['id']}")
+    assert response.json()["class_name"] == "11A"
+    assert response.headers["ETag"] == '"2"'
+
+    response = await async_client.get(f"/api/v1/users/{users[2]['id']}")
+    assert response.headers["ETag"] == '"1"'
+
+
+async def test_delete_users_by_filter(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест удаления по фильтру одним DELETE и режима dry_run."""
+    users = await create_users(async_client, users_data)
+
+    response = await async_client.request(
+        "DELETE", "/api/v1/users/user_filter", json=STUDENTS_10A, params={"dry_run": True}
+    )
+    assert response.json() == {"count": 2, "dry_run": True}
+
+    response = await async_client.request("DELETE", "/api/v1/users/user_filter", json=STUDENTS_10A)
+    assert response.json() == {"count": 2, "dry_run": False}
+
+    response = await async_client.post("/api/v1/users/user_filter", json={})
+    assert [user["id"] for user in response.json()] == [users[2]["id"]]
+
+
+async def test_write_by_filter_rejects_empty_request(async_client: AsyncClient) -> None:
+    """Тест запрета изменения без фильтра и без новых значений."""
+    response = await async_client.request("DELETE", "/api/v1/users/user_filter", json={})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = await async_client.patch(
+        "/api/v1/users/user_filter", json={"filter": STUDENTS_10A, "values": {}}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = await async_client.patch(
+        "/api/v1/users/user_filter",
+        json={"filter": STUDENTS_10A, "values": {"login": "same_login"}},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize("field", ["name", "surname", "type"])
+async def test_update_by_filter_rejects_null_required_fields(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]],
+    field: str
+) -> None:
+    """Тест: null в обязательной колонке - 422, а необязательные можно очистить."""
+    await create_users(async_client, users_data)
+    response = await async_client.patch(
+        "/api/v1/users/user_filter", json={"filter": STUDENTS_10A, "values": {field: None}}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["detail"][0]["loc"] == ["body", "values", field]
+
+    response = await async_client.patch(
+        "/api/v1/users/user_filter", json={"filter": STUDENTS_10A, "values": {"class_name": None}}
+    )
+    assert response.status_code == status.HTTP_200_OK
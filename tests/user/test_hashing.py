@@ -0,0 +1,69 @@
+import asyncio
+
+import bcrypt
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.api.v1.endpoints import users
+from app.core.security import HashingQueueFull, PasswordHasher, hash_rounds
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_hasher_produces_valid_hash() -> None:
+    """Тест хеширования пароля в пуле."""
+    hasher = PasswordHasher(pool_kind="thread", pool_size=2, queue_size=2)
+    try:
+        password_hash = await hasher.hash("supersecret")
+    finally:
+        hasher.shutdown()
+    assert bcrypt.checkpw(b"supersecret", password_hash.encode("utf-8"))
+    assert hasher.pending == 0
+
+
+async def test_hasher_rejects_when_queue_is_full() -> None:
+    """Тест отказа при переполнении очереди хеширования."""
+    hasher = PasswordHasher(pool_kind="thread", pool_size=1, queue_size=0)
+    try:
+        results = await asyncio.gather(
+            hasher.hash("supersecret"),
+            hasher.hash("supersecret"),
+            return_exceptions=True,
+        )
+    finally:
+        hasher.shutdown()
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], HashingQueueFull)
+
+
+async def test_create_user_when_hashing_is_saturated(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Тест ответа 503 при переполненной очереди хеширования."""
+    hasher = PasswordHasher(pool_kind="thread", pool_size=1, queue_size=0)
+    hasher._pending = hasher.capacity  # pylint: disable=protected-access
+    monkeypatch.setattr(users, "get_password_hasher", lambda: hasher)
+
+    response = await async_client.post("/api/v1/users", json=user_data)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+
+async def test_hasher_verify_and_rounds() -> None:
+    """Тест проверки пароля и определения устаревшей стоимости."""
+    hasher = PasswordHasher(pool_kind="thread", pool_size=1, queue_size=1, rounds=5)
+    try:
+        password_hash = await hasher.hash("supersecret")
+        assert await hasher.verify("supersecret", password_hash)
+        assert not await hasher.verify("wrong", password_hash)
+        assert not await hasher.verify("supersecret", None)
+        assert not await hasher.verify("supersecret", "not a bcrypt hash")
+    finally:
+        hasher.shutdown()
+    assert hash_rounds(password_hash) == 5
+    assert not hasher.needs_rehash(password_hash)
+    hasher.rounds = 6
+    assert hasher.needs_rehash(password_hash)
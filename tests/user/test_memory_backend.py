@@ -0,0 +1,56 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.db.memory import MemoryUserRepository
+from app.db.repository import get_read_user_repository, get_user_repository
+from app.main import app
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def memory_repository(override_dependency) -> MemoryUserRepository:
+    """Подменяет хранилище пользователей на хранилище в памяти."""
+    repository = MemoryUserRepository()
+    app.dependency_overrides[get_user_repository] = lambda: repository
+    app.dependency_overrides[get_read_user_repository] = lambda: repository
+    return repository
+
+
+async def test_api_on_memory_backend(
+    async_client: AsyncClient,
+    memory_repository: MemoryUserRepository,
+    user_data: dict[str, str],
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест маршрутов поверх хранилища в памяти, без обращений к БД."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    assert response.status_code == status.HTTP_201_CREATED
+    user_id = response.json()["id"]
+    assert len(memory_repository) == 1
+
+    response = await async_client.post("/api/v1/users", json=user_data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = await async_client.patch(f"/api/v1/users/{user_id}", json={"subject": "Химия"})
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.json()["subject"] == "Химия"
+    assert response.headers["ETag"] == etag
+
+    for data in users_data[1:]:
+        await async_client.post("/api/v1/users", json=data)
+    response = await async_client.post(
+        "/api/v1/users/user_filter", params={"limit": 1}, json={"type": "student"}
+    )
+    assert len(response.json()) == 1
+    assert "X-Next-Cursor" in response.headers
+
+    response = await async_client.delete(f"/api/v1/users/{user_id}", headers={"If-Match": '"1"'})
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    response = await async_client.delete(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert len(memory_repository) == len(users_data) - 1
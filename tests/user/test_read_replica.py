@@ -0,0 +1,72 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import base
+from app.db.base import READ_PRIMARY_HEADER, Base
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def replica(monkeypatch: pytest.MonkeyPatch):
+    """
+    Отдельная пустая БД в роли реплики: записи в основную БД в ней не видны,
+    поэтому по ответам понятно, откуда читал эндпоинт.
+    """
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(
+        base, "ReadSessionLocal", sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    yield engine
+    await engine.dispose()
+
+
+async def test_reads_go_to_replica(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    replica
+) -> None:
+    """Тест чтения с реплики и записи в основную БД."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    assert response.status_code == status.HTTP_201_CREATED
+    user_id = response.json()["id"]
+
+    response = await async_client.get(f"/api/v1/users/{user_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await async_client.post("/api/v1/users/batch_get", json={"ids": [user_id]})
+    assert response.json()["missing"] == [user_id]
+
+    response = await async_client.post("/api/v1/users/stats", json={"filter": {}, "group_by": []})
+    assert response.json()["total"] == 0
+
+    response = await async_client.patch(f"/api/v1/users/{user_id}", json={"name": "Пётр"})
+    assert response.status_code == status.HTTP_200_OK
+
+
+async def test_read_primary_header(
+    async_client: AsyncClient,
+    user_data: dict[str, str],
+    replica
+) -> None:
+    """Тест чтения своих изменений с основной БД по заголовку X-Read-Primary."""
+    response = await async_client.post("/api/v1/users", json=user_data)
+    user_id = response.json()["id"]
+
+    response = await async_client.get(
+        f"/api/v1/users/{user_id}", headers={READ_PRIMARY_HEADER: "true"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["login"] == user_data["login"]
+
+    response = await async_client.post(
+        "/api/v1/users/user_filter",
+        json={"type": user_data["type"]},
+        headers={READ_PRIMARY_HEADER: "1"},
+    )
+    assert [user["id"] for user in response.json()] == [user_id]
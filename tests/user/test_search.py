@@ -0,0 +1,46 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_search_users_by_prefix(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест поиска по началу фамилии, имени и login без учёта регистра."""
+    for user_data in users_data:
+        response = await async_client.post("/api/v1/users", json=user_data)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    response = await async_client.get("/api/v1/users/search", params={"q": "Петр"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [user["login"] for user in response.json()] == ["petr_petrov"]
+
+    response = await async_client.get("/api/v1/users/search", params={"q": "BO"})
+    assert [user["login"] for user in response.json()] == ["boss"]
+
+    response = await async_client.get("/api/v1/users/search", params={"q": "Ив", "limit": 1})
+    assert len(response.json()) == 1
+
+
+async def test_search_users_escapes_wildcards(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест экранирования символов LIKE в запросе."""
+    for user_data in users_data:
+        await async_client.post("/api/v1/users", json=user_data)
+
+    response = await async_client.get("/api/v1/users/search", params={"q": "%%"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+
+async def test_search_users_validation(async_client: AsyncClient) -> None:
+    """Тест ограничений на запрос и limit."""
+    response = await async_client.get("/api/v1/users/search", params={"q": "И"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    response = await async_client.get("/api/v1/users/search", params={"q": "Ив", "limit": 1000})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,46 @@
+import uuid
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.v1.endpoints.users import serialize_user, serialize_users
+from app.db.models import User
+from app.schemas.user import UserResponse
+
+
+def make_user(name: str) -> User:
+    return User(
+        id=uuid.uuid4(),
+        name=name,
+        surname="Иванов",
+        patronymic=None,
+        password_hash="hash",
+        type="teacher",
+        class_name=None,
+        login="ivanov_i",
+        subject="Физика",
+    )
+
+
+def fastapi_body(content) -> bytes:
+    """Тело ответа, которое FastAPI собрал бы через response_model."""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["Иван", 'Quote " and \\ backslash', "Tab\tnew\nline\x01", "</script>", "Emoji 🙂", " "],
+)
+def test_serialize_user_matches_fastapi(name: str) -> None:
+    """Тест побайтовой совместимости с сериализацией FastAPI."""
+    user = make_user(name)
+    assert serialize_user(user) == fastapi_body(UserResponse.model_validate(user))
+
+
+def test_serialize_users_matches_fastapi() -> None:
+    """Тест побайтовой совместимости списка пользователей."""
+    users = [make_user("Иван"), make_user("Пётр")]
+    expected = fastapi_body([UserResponse.model_validate(user) for user in users])
+    assert serialize_users(users) == expected
+    assert serialize_users([]) == b"[]"
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_get_users_stats(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест подсчёта пользователей с группировкой."""
+    for user_data in users_data:
+        response = await async_client.post("/api/v1/users", json=user_data)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    response = await async_client.post(
+        "/api/v1/users/stats", json={"group_by": ["type", "class_name"]}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total"] == 3
+    groups = {(group["type"], group["class_name"]): group["count"] for group in data["groups"]}
+    assert groups == {("student", "10A"): 2, ("teacher", None): 1}
+    assert all("subject" not in group for group in data["groups"])
+
+
+async def test_get_users_stats_with_filter(
+    async_client: AsyncClient,
+    users_data: list[dict[str, str]]
+) -> None:
+    """Тест подсчёта пользователей по фильтру без группировки."""
+    for user_data in users_data:
+        await async_client.post("/api/v1/users", json=user_data)
+
+    response = await async_client.post(
+        "/api/v1/users/stats", json={"filter": {"type": "teacher"}, "group_by": ["subject"]}
+    )
+    assert response.json() == {"total": 1, "groups": [{"subject": "Math", "count": 1}]}
+
+    response = await async_client.post("/api/v1/users/stats", json={"filter": {"type": "student"}})
+    assert response.json()["total"] == 2
+
+
+async def test_get_users_stats_invalid_group(async_client: AsyncClient) -> None:
+    """Тест запрета группировки по произвольному полю."""
+    response = await async_client.post("/api/v1/users/stats", json={"group_by": ["login"]})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def test_get_users_stats_empty(async_client: AsyncClient) -> None:
+    """Тест подсчёта без фильтра и группировки на пустой таблице."""
+    response = await async_client.post("/api/v1/users/stats", json={})
+    assert response.json() == {"total": 0, "groups": [{"count": 0}]}
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints import users
+from app.core.security import PasswordHasher, hash_rounds
+from app.db.models import User
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_verify_password(
+    async_client: AsyncClient,
+    user_data: dict[str, str]
+) -> None:
+    """Тест проверки верного и неверного пароля."""
+    create_response = await async_client.post("/api/v1/users", json=user_data)
+    user_id = create_response.json()["id"]
+
+    response = await async_client.post(
+        "/api/v1/users/verify_password",
+        json={"login": user_data["login"], "password": user_data["password"]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"id": user_id, "valid": True}
+
+    response = await async_client.post(
+        "/api/v1/users/verify_password",
+        json={"login": user_data["login"], "password": "wrong password"},
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await async_client.post(
+        "/api/v1/users/verify_password",
+        json={"login": "nobody", "password": user_data["password"]},
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_verify_password_rehashes_outdated_cost(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    user_data: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тест пересчёта хеша с устаревшей стоимостью при успешной проверке."""
+    await async_client.post("/api/v1/users", json=user_data)
+
+    hasher = PasswordHasher(pool_kind="thread", pool_size=1, queue_size=4, rounds=5)
+    monkeypatch.setattr(users, "get_password_hasher", lambda: hasher)
+    try:
+        response = await async_client.post(
+            "/api/v1/users/verify_password",
+            json={"login": user_data["login"], "password": user_data["password"]},
+        )
+    finally:
+        hasher.shutdown()
+    assert response.status_code == status.HTTP_200_OK
+
+    result = await db_session.execute(
+        select(User.password_hash).where(User.login == user_data["login"])
+    )
+    assert hash_rounds(result.scalar_one()) == 5